@@ -2,7 +2,9 @@ import os
 import sys
 import io
 import streamlit as st
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from data_store import WarmupError, get_summary
+from summary import pending_over_1_year
+from helpers.warming import rerun_when_ready
 import base64
 from pathlib import Path
 import warnings
@@ -200,16 +202,25 @@ st.markdown("<div style='height: 50px;'></div>", unsafe_allow_html=True)
 # -------------------------------------------------
 # LOAD DATA (Statistics)
 # -------------------------------------------------
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-
-merged = merge_data(cases, hearings)
-
-total_cases = len(cases)
-civil_cases = len(cases)
-criminal_cases = 0
-older_than_1 = len(cases[cases.get("disposal_days", 0) > 365])
+# Precomputed per data version; the landing page never loads the frames.
+# If the summary is not ready, the warm-up builds it and the cards show a
+# placeholder until then
+try:
+    summary = get_summary()
+    load_error = None
+except WarmupError as e:
+    summary, load_error = None, e
+
+if summary is not None:
+    total_cases = f"{summary['total_cases']:,}"
+    civil_cases = f"{summary['civil_cases']:,}"
+    criminal_cases = f"{summary['criminal_cases']:,}"
+    older_than_1 = f"{pending_over_1_year(summary):,}"
+elif load_error is not None:
+    st.error(f"The court data could not be loaded: {load_error}")
+    total_cases = civil_cases = criminal_cases = older_than_1 = "—"
+else:
+    total_cases = civil_cases = criminal_cases = older_than_1 = "…"
 
 # -------------------------------------------------
 # QUICK STATS
@@ -220,7 +231,7 @@ with c1:
     st.markdown(f"""
     <div class='stat-card'>
         <div class='stat-title'>Total Cases</div>
-        <div class='stat-value'>{total_cases:,}</div>
+        <div class='stat-value'>{total_cases}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -228,7 +239,7 @@ with c2:
     st.markdown(f"""
     <div class='stat-card'>
         <div class='stat-title'>Civil Cases</div>
-        <div class='stat-value'>{civil_cases:,}</div>
+        <div class='stat-value'>{civil_cases}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -236,7 +247,7 @@ with c3:
     st.markdown(f"""
     <div class='stat-card'>
         <div class='stat-title'>Criminal Cases</div>
-        <div class='stat-value'>{criminal_cases:,}</div>
+        <div class='stat-value'>{criminal_cases}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -244,7 +255,7 @@ with c4:
     st.markdown(f"""
     <div class='stat-card'>
         <div class='stat-title'>Pending > 1 year</div>
-        <div class='stat-value'>{older_than_1:,}</div>
+        <div class='stat-value'>{older_than_1}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -294,3 +305,7 @@ st.markdown("""
 • Law & Justice • Developed by Nyayadrishti •
 </div>
 """, unsafe_allow_html=True)
+
+# Refresh the statistics once the warm-up has finished
+if summary is None and load_error is None:
+    rerun_when_ready(lambda: get_summary() is not None)
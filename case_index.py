@@ -0,0 +1,141 @@
+# Case -> hearings offset index.
+#
+# Hearings are kept grouped by case (clean_hearings sorts them by cnr_number
+# and date), so the hearings of case i are the row range [starts[i], stops[i])
+# of the hearings frame - an O(1) slice. Dashboards join on demand for the
+# cases they show instead of materialising the full case x hearing merge.
+# A hash index on the case key finds a case's row in constant time.
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import join_indexer, join_by_indexer
+
+
+class CaseHearings:
+    """Row ranges of each case's hearings in a frame grouped by the case key."""
+
+    def __init__(self, cases, hearings, starts, stops, case_key, hearing_key):
+        self.cases = cases
+        self.hearings = hearings
+        self.starts = starts
+        self.stops = stops
+        self.case_key = case_key
+        self.hearing_key = hearing_key
+
+    @classmethod
+    def build(cls, cases, hearings, case_key="cnr_number", hearing_key="cnr_number"):
+        codes, _ = pd.factorize(hearings[hearing_key], use_na_sentinel=False)
+        n = len(codes)
+        run_starts = np.flatnonzero(np.r_[True, np.diff(codes) != 0]) if n else np.zeros(0, np.intp)
+        if len(run_starts) != len(np.unique(codes)):
+            # Not grouped by this key: reorder once, stably so each case's
+            # hearings keep their date order
+            order = np.argsort(codes, kind="stable")
+            hearings = hearings.take(order).reset_index(drop=True)
+            codes = codes[order]
+            run_starts = np.flatnonzero(np.r_[True, np.diff(codes) != 0]) if n else run_starts
+        run_stops = np.r_[run_starts[1:], n].astype(np.intp)
+
+        # Run keys are unique, so join_indexer gives each case its run
+        run_keys = hearings[hearing_key].take(run_starts).reset_index(drop=True)
+        _, run = join_indexer(cases[case_key].reset_index(drop=True), run_keys)
+        matched = run >= 0
+        starts = np.where(matched, run_starts[np.maximum(run, 0)], 0).astype(np.intp)
+        stops = np.where(matched, run_stops[np.maximum(run, 0)], 0).astype(np.intp)
+        return cls(cases.reset_index(drop=True), hearings, starts, stops, case_key, hearing_key)
+
+    @cached_property
+    def _key_index(self):
+        # Hash table over the case keys; a repeated key resolves to its first row
+        keys = self.cases[self.case_key]
+        first = ~keys.duplicated().to_numpy()
+        return pd.Index(keys[first]), np.flatnonzero(first)
+
+    def case_rows(self, keys) -> np.ndarray:
+        """
+        Row positions of the cases with the given keys (-1 if unknown), one
+        hash probe per key, so a pasted list costs the same per CNR as one.
+        """
+        index, rows = self._key_index
+        found = index.get_indexer(pd.Index(list(keys), dtype=index.dtype))
+        return np.where(found >= 0, rows[np.maximum(found, 0)], -1)
+
+    def case_row(self, key):
+        """Row position of the case with key, or None."""
+        row = self.case_rows([key])[0]
+        return None if row < 0 else int(row)
+
+    @cached_property
+    def hearing_cases(self) -> np.ndarray:
+        """Case row of every hearing, -1 for a hearing without a case."""
+        case_of = np.full(len(self.hearings), -1, dtype=np.intp)
+        case_idx, hearing_idx = self.positions(np.flatnonzero(self.counts > 0))
+        case_of[hearing_idx] = case_idx
+        return case_of
+
+    @property
+    def counts(self):
+        """Number of hearings of each case."""
+        return self.stops - self.starts
+
+    def hearings_of(self, case_row) -> pd.DataFrame:
+        """All hearings of the case at position case_row."""
+        return self.hearings.iloc[self.starts[case_row]:self.stops[case_row]]
+
+    def positions(self, case_rows):
+        """
+        (case_idx, hearing_idx) of cases LEFT JOIN hearings restricted to
+        case_rows; a case without hearings gets one row with hearing_idx -1.
+        """
+        rows = np.asarray(case_rows, dtype=np.intp)
+        counts = self.counts[rows]
+        per_case = np.maximum(counts, 1)
+        case_idx = np.repeat(rows, per_case)
+        first = np.cumsum(per_case) - per_case
+        within = np.arange(len(case_idx)) - np.repeat(first, per_case)
+        hearing_idx = np.where(
+            np.repeat(counts > 0, per_case), np.repeat(self.starts[rows], per_case) + within, -1
+        )
+        return case_idx, hearing_idx.astype(np.intp)
+
+    def join(self, case_rows=None, suffixes=("_x", "_y")) -> pd.DataFrame:
+        """
+        pd.merge(cases, hearings, how="left") for case_rows only (all cases
+        if None), with hearings in stored order within each case.
+        """
+        if case_rows is None:
+            case_rows = np.arange(len(self.cases))
+        case_idx, hearing_idx = self.positions(case_rows)
+        return join_by_indexer(self.cases, self.hearings, case_idx, hearing_idx,
+                               self.case_key, self.hearing_key, suffixes)
+
+    def join_where(self, hearing_mask, suffixes=("_x", "_y")) -> pd.DataFrame:
+        """
+        The rows of the case x hearing merge whose hearing satisfies
+        hearing_mask (aligned with self.hearings), in merge order.
+        """
+        mask = pd.Series(hearing_mask).fillna(False).to_numpy(dtype=bool)
+        hits = np.r_[0, np.cumsum(mask)]
+        case_rows = np.flatnonzero(hits[self.stops] - hits[self.starts] > 0)
+        case_idx, hearing_idx = self.positions(case_rows)
+        keep = hearing_idx >= 0
+        keep[keep] = mask[hearing_idx[keep]]
+        return join_by_indexer(self.cases, self.hearings, case_idx[keep], hearing_idx[keep],
+                               self.case_key, self.hearing_key, suffixes)
+
+    def join_hearings(self, hearing_rows, suffixes=("_x", "_y")) -> pd.DataFrame:
+        """join_where for the hearings at positions hearing_rows, e.g. from an index."""
+        mask = np.zeros(len(self.hearings), dtype=bool)
+        mask[hearing_rows] = True
+        return self.join_where(mask, suffixes)
+
+
+def case_hearings(dataset, case_key="cnr_number", hearing_key="cnr_number"):
+    """The CaseHearings index of dataset, built once per data version."""
+    return dataset.derived(
+        f"case_hearings:{case_key}:{hearing_key}",
+        lambda ds: CaseHearings.build(ds.cases, ds.hearings, case_key, hearing_key),
+    )
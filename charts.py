@@ -0,0 +1,195 @@
+# Server-side chart helpers.
+#
+# Pages used to hand whole columns to Plotly or seaborn, so the payload and
+# the browser's drawing time grew with the number of rows. These helpers
+# reduce the data first - histograms to bin counts, long series to a bounded
+# number of points - and render the reduced form, which is the same size
+# whatever the row count. Finished figures are cached by filter state, so a
+# rerun that did not change a chart's inputs does not rebuild it.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+FIGURE_CACHE_SIZE = 256
+# Points a downsampled line chart sends to the browser by default
+DEFAULT_MAX_POINTS = 1000
+
+
+class LRUCache:
+    """A small thread-safe mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, builder):
+        """The value cached under key, calling builder() on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        # Built outside the lock; two sessions missing together both build
+        value = builder()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ----------------------------
+# Histograms
+# ----------------------------
+def bin_counts(values, bins=40, range=None):
+    """(counts, bin_edges) of the finite values, as np.histogram."""
+    values = np.asarray(values, dtype="float64")
+    return np.histogram(values[np.isfinite(values)], bins=bins, range=range)
+
+
+def histogram_figure(counts, edges, x_label, y_label="count", title=None, color=None):
+    """A bar trace per bin, drawn edge to edge like px.histogram."""
+    edges = np.asarray(edges, dtype="float64")
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=np.asarray(counts),
+        width=np.diff(edges),
+        marker_color=color,
+        hovertemplate=f"{x_label}: %{{customdata[0]:.4g}} – %{{customdata[1]:.4g}}"
+                      f"<br>{y_label}: %{{y}}<extra></extra>",
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+    ))
+    fig.update_layout(title=title, bargap=0, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
+# ----------------------------
+# Line downsampling
+# ----------------------------
+def lttb(x, y, n_out) -> np.ndarray:
+    """
+    Positions of the n_out points Largest-Triangle-Three-Buckets keeps: the
+    first and last point, and from each bucket in between the point forming
+    the largest triangle with the previous pick and the next bucket's mean.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # n_out - 2 buckets over the interior points; the last "next bucket" is
+    # the final point
+    edges = np.r_[np.linspace(1, n - 1, n_out - 1).astype(np.intp), n]
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_x = x[edges[i + 1]:edges[i + 2]].mean()
+        next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        area = np.abs(
+            (x[a] - next_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def minmax(x, y, n_out) -> np.ndarray:
+    """Positions of the minimum and maximum of y in n_out // 2 equal buckets."""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(np.intp)
+    bucket = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    # Sorted by bucket, then value: each bucket's first and last are its extremes
+    order = np.lexsort((y, bucket))
+    return np.unique(np.r_[order[edges[:-1]], order[edges[1:] - 1]])
+
+
+DOWNSAMPLERS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(frame, columns, max_points=DEFAULT_MAX_POINTS, method="lttb", x=None):
+    """
+    The rows of frame that keep the shape of each of columns, at most about
+    max_points in all, in their original order. Points are chosen along x
+    (a column of frame; row order if None), skipping missing values.
+    """
+    picker = DOWNSAMPLERS[method]
+    if len(frame) <= max_points:
+        return frame
+    per_series = max(max_points // max(len(columns), 1), 3)
+    xs = np.arange(len(frame), dtype="float64") if x is None else frame[x].to_numpy(dtype="float64")
+    rows = []
+    for col in columns:
+        ys = frame[col].to_numpy(dtype="float64", na_value=np.nan)
+        present = np.flatnonzero(np.isfinite(ys) & np.isfinite(xs))
+        rows.append(present[picker(xs[present], ys[present], per_series)])
+    return frame.iloc[np.unique(np.concatenate(rows))] if rows else frame.iloc[:0]
+
+
+def bucket_comparison(actual, predicted, buckets=20) -> pd.DataFrame:
+    """
+    Mean predicted and actual value per quantile bucket of predicted, with
+    the number of rows in each - predicted vs actual in `buckets` points.
+    """
+    frame = pd.DataFrame({
+        "predicted": np.asarray(predicted, dtype="float64"),
+        "actual": np.asarray(actual, dtype="float64"),
+    }).dropna()
+    if frame.empty:
+        return pd.DataFrame(columns=["predicted", "actual", "cases"])
+    bucket = pd.qcut(frame["predicted"], q=buckets, duplicates="drop")
+    return (
+        frame.groupby(bucket, observed=True)
+        .agg(predicted=("predicted", "mean"), actual=("actual", "mean"),
+             cases=("actual", "size"))
+        .reset_index(drop=True)
+    )
+
+
+# ----------------------------
+# Figure cache
+# ----------------------------
+_figures = LRUCache(FIGURE_CACHE_SIZE)
+
+
+def normalize_params(params):
+    """
+    A hashable, order-independent form of a chart's filter values: mappings
+    by key, lists and sets of selected values sorted, numpy scalars as
+    Python values - so [2019, 2020] and (2020, 2019) share an entry.
+    """
+    if isinstance(params, dict):
+        return tuple(sorted((str(k), normalize_params(v)) for k, v in params.items()))
+    if isinstance(params, (list, tuple, set, frozenset, np.ndarray, pd.Index, pd.Series)):
+        return tuple(sorted((normalize_params(v) for v in params), key=repr))
+    if isinstance(params, np.generic):
+        return params.item()
+    return params
+
+
+def cached_figure(version, chart_id, params, build) -> dict:
+    """
+    The figure of chart_id for the data version and filter params, as the
+    dict st.plotly_chart takes. On a miss build() aggregates and draws it,
+    and its dict is kept in an LRU cache shared by all sessions; a hit
+    returns that dict as is, so callers must not modify it.
+    """
+    key = (version, chart_id, normalize_params(params))
+    return _figures.get_or_compute(key, lambda: build().to_dict())
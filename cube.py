@@ -0,0 +1,191 @@
+# Pre-aggregated cube behind the Analytics dashboard.
+#
+# Built once per data version, keyed by (filing_year, stage, judge, status).
+# Each cell holds case counts, disposal-day count / sum / sum of squares /
+# days-over-a-year and a fixed-bin disposal histogram, plus the number of
+# hearings. A filter change then sums a few hundred cells instead of
+# re-aggregating every case and hearing.
+#
+# Case measures count each case once, at the stage and judge of its latest
+# hearing; the hearing count places each hearing at its own stage and judge.
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+from case_index import case_hearings
+from merged_view import merged_view
+from preprocessing import take_column
+
+DIMENSIONS = ["filing_year", "stage", "judge", "status"]
+HISTOGRAM_BINS = 40
+STAGE_COLUMN = "remappedstages"
+STATUS_COLUMN = "current_status"
+# As the Judge Workload tab looks them up on the hearings
+JUDGE_COLUMNS = ["before_honourable_judges", "before_hon_judge", "njdg_judge_name"]
+
+
+def _hist_columns(n):
+    return [f"hist_{i}" for i in range(n)]
+
+
+class AnalyticsCube:
+    """Aggregate cells plus the disposal-day histogram bin edges."""
+
+    def __init__(self, cells, bin_edges):
+        self.cells = cells
+        self.bin_edges = np.asarray(bin_edges, dtype="float64")
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+    @classmethod
+    def build(cls, dataset):
+        index = case_hearings(dataset)
+        cases, hearings = index.cases, index.hearings
+
+        def column(frame, name):
+            if name in frame.columns:
+                return frame[name]
+            return pd.Series(np.nan, index=pd.RangeIndex(len(frame)), dtype="float64")
+
+        judge_col = next((c for c in JUDGE_COLUMNS if c in hearings.columns), None)
+        stage = column(hearings, STAGE_COLUMN)
+        judge = column(hearings, judge_col)
+
+        # Case grain: stage and judge of each case's latest hearing
+        latest = np.where(index.counts > 0, index.stops - 1, -1)
+        disposal = column(cases, "disposal_days").to_numpy(dtype="float64", na_value=np.nan)
+        finite = disposal[~np.isnan(disposal)]
+        bin_edges = np.histogram_bin_edges(finite if len(finite) else [0, 1], bins=HISTOGRAM_BINS)
+        bins = np.clip(np.searchsorted(bin_edges, disposal, side="right") - 1, 0, HISTOGRAM_BINS - 1)
+
+        case_facts = pd.DataFrame({
+            "filing_year": column(cases, "filing_year").to_numpy(dtype="float64", na_value=np.nan),
+            "stage": take_column(stage, latest, allow_fill=True),
+            "judge": take_column(judge, latest, allow_fill=True),
+            "status": column(cases, STATUS_COLUMN).array,
+            "disposal": disposal,
+            "bin": np.where(np.isnan(disposal), -1, bins),
+        })
+        case_facts["disposal_sq"] = case_facts["disposal"] ** 2
+        case_facts["over_365"] = case_facts["disposal"] > 365
+
+        groups = case_facts.groupby(DIMENSIONS, dropna=False, observed=True, sort=False)
+        case_cells = groups.agg(
+            cases=("disposal", "size"),
+            disposal_n=("disposal", "count"),
+            disposal_sum=("disposal", "sum"),
+            disposal_sumsq=("disposal_sq", "sum"),
+            over_365=("over_365", "sum"),
+        )
+        histogram = (
+            case_facts[case_facts["bin"] >= 0]
+            .groupby(DIMENSIONS + ["bin"], dropna=False, observed=True, sort=False)
+            .size()
+            .unstack("bin", fill_value=0)
+            .reindex(columns=range(HISTOGRAM_BINS), fill_value=0)
+        )
+        histogram.columns = _hist_columns(HISTOGRAM_BINS)
+        case_cells = case_cells.join(histogram, how="left")
+
+        # Hearing grain: every hearing at its own stage and judge, with the
+        # year and status of its case (missing for a hearing without one),
+        # resolved through the merged view instead of a materialised merge
+        merged = merged_view(dataset)
+        hearing_facts = pd.DataFrame({
+            "filing_year": column(merged, "filing_year").to_numpy(dtype="float64", na_value=np.nan),
+            "stage": stage.array,
+            "judge": judge.array,
+            "status": column(merged, STATUS_COLUMN).array,
+        })
+        hearing_cells = (
+            hearing_facts.groupby(DIMENSIONS, dropna=False, observed=True, sort=False)
+            .size().rename("hearings")
+        )
+
+        cells = case_cells.join(hearing_cells, how="outer").reset_index()
+        measures = [c for c in cells.columns if c not in DIMENSIONS]
+        cells[measures] = cells[measures].fillna(0)
+        for col in measures:
+            if col not in ("disposal_sum", "disposal_sumsq"):
+                cells[col] = cells[col].astype(np.int64)
+        for col in ("stage", "judge", "status"):
+            cells[col] = cells[col].astype(object)
+        return cls(cells, bin_edges)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    @property
+    def years(self):
+        years = self.cells["filing_year"].dropna().unique()
+        return sorted(int(y) for y in years)
+
+    def slice(self, years=None) -> pd.DataFrame:
+        """Cells of the selected filing years (all cells if none selected)."""
+        if not years:
+            return self.cells
+        return self.cells[self.cells["filing_year"].isin([float(y) for y in years])]
+
+    def totals(self, years=None):
+        cells = self.slice(years)
+        return {"cases": int(cells["cases"].sum()), "over_365": int(cells["over_365"].sum())}
+
+    def stage_counts(self, years=None) -> pd.Series:
+        """Cases by the stage of their latest hearing, largest first."""
+        counts = self.slice(years).groupby("stage")["cases"].sum()
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def disposal_by_year(self, years=None) -> pd.DataFrame:
+        """filing_year, mean and standard deviation of disposal days."""
+        sums = self.slice(years).groupby("filing_year")[
+            ["disposal_n", "disposal_sum", "disposal_sumsq"]
+        ].sum()
+        sums = sums[sums["disposal_n"] > 0]
+        mean = sums["disposal_sum"] / sums["disposal_n"]
+        variance = (sums["disposal_sumsq"] / sums["disposal_n"] - mean ** 2).clip(lower=0)
+        return pd.DataFrame({
+            "filing_year": sums.index.astype(int),
+            "disposal_days": mean.to_numpy(),
+            "disposal_std": np.sqrt(variance).to_numpy(),
+        })
+
+    def judge_hearings(self, years=None) -> pd.Series:
+        """Hearings per judge, largest first."""
+        counts = self.slice(years).groupby("judge")["hearings"].sum()
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def histogram(self, years=None):
+        """(counts, bin_edges) of disposal days over the fixed bins."""
+        counts = self.slice(years)[_hist_columns(HISTOGRAM_BINS)].sum().to_numpy()
+        return counts, self.bin_edges
+
+
+def analytics_cube(dataset) -> AnalyticsCube:
+    """
+    The cube for dataset, built once per data version. With the shared
+    snapshot on, the cells are stored next to the snapshot and read by
+    every process.
+    """
+    def build(ds):
+        if not snapshot.snapshot_enabled():
+            return AnalyticsCube.build(ds)
+
+        projection = hashlib.sha256(repr(ds.columns).encode()).hexdigest()[:8]
+        artifact = f"analytics-cube-{projection}"
+        stored = snapshot.load_artifact(ds.version, artifact)
+        if stored is None:
+            with snapshot.build_lock(ds.version):
+                stored = snapshot.load_artifact(ds.version, artifact)
+                if stored is None:
+                    cube = AnalyticsCube.build(ds)
+                    snapshot.write_artifact(ds.version, artifact, cube.cells,
+                                            {"bin_edges": cube.bin_edges.tolist()})
+                    return cube
+        cells, metadata = stored
+        return AnalyticsCube(cells, metadata["bin_edges"])
+
+    return dataset.derived("analytics_cube", build)
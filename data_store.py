@@ -0,0 +1,436 @@
+# Process-wide store for the cleaned court data.
+#
+# Pages used to run load_data -> clean_cases -> clean_hearings -> merge_data
+# on every rerun. The store builds each frame once per data version and hands
+# out shallow, copy-on-write views, so a widget interaction costs nothing here.
+
+import hashlib
+import threading
+import time
+import warnings
+from concurrent.futures import Future
+from pathlib import Path
+
+import pandas as pd
+
+from preprocessing import (
+    load_data, clean_cases, clean_hearings, report_memory, project_columns,
+    add_hearing_aggregates, SCHEMA_VERSION,
+)
+from data_watcher import DataWatcher
+from merged_view import merged_view
+from summary import SUMMARY_COLUMNS, build_summary
+import ingest
+import snapshot
+
+# Views share memory with the stored frames; copy-on-write keeps a page that
+# assigns a column from mutating the frame every other session sees.
+# (Always on from pandas 3, where the option is deprecated.)
+if int(pd.__version__.split(".")[0]) < 3:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        pd.set_option("mode.copy_on_write", True)
+
+DATA_DIR = Path(__file__).parent / "data"
+SOURCE_FILES = ["ISDMHack_Cases_students.csv", "ISDMHack_Hear_students.csv"]
+
+
+_watcher = DataWatcher(DATA_DIR)
+
+
+def _source_state(force=False):
+    """
+    (base_key, delta_ids, version): content hashes of the base extract, the
+    ingested deltas and the fingerprint of everything under data/, combined
+    with the schema version so a layout change also invalidates snapshots.
+    """
+    version, fingerprint = _watcher.check(force)
+    base_key = ";".join(f"{name}:{fingerprint.get(name, 'missing')}" for name in SOURCE_FILES)
+    version = hashlib.sha256(f"{version}:{SCHEMA_VERSION}".encode()).hexdigest()[:16]
+    return base_key, ingest.list_deltas(), version
+
+
+def data_version(state=None) -> str:
+    """Identify the current data: changes only when a file under data/ changes."""
+    return (state or _source_state())[2]
+
+
+def check_for_changes():
+    """Re-fingerprint data/ now instead of waiting for the next poll."""
+    return data_version(_source_state(force=True))
+
+
+class Dataset:
+    """
+    Cleaned cases, hearings and their merge for one data version, holding
+    either every column or a projection (columns is None or a tuple of
+    normalised source columns). The merge is a lazy view over the two
+    frames; derived() memoises anything else a page wants to compute once
+    per version.
+    """
+
+    def __init__(self, version, cases, hearings, base_key=None, deltas=(), columns=None):
+        self.version = version
+        self.base_key = base_key
+        self.deltas = deltas
+        self.columns = columns
+        self._cases = cases
+        self._hearings = hearings
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @property
+    def cases(self) -> pd.DataFrame:
+        return self._cases.copy(deep=False)
+
+    @property
+    def hearings(self) -> pd.DataFrame:
+        return self._hearings.copy(deep=False)
+
+    @property
+    def merged(self):
+        """merge_data(cases, hearings) as a LazyMerged view (see merged_view.py)."""
+        return merged_view(self)
+
+    def derived(self, key, builder):
+        """Return builder(self), computed once per version and shared by all sessions."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self)
+            value = self._derived[key]
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        return value
+
+    def project(self, columns) -> "Dataset":
+        """A dataset sharing this one's frames, restricted to columns."""
+        wanted = set(columns)
+        cases = self._cases[[c for c in self._cases.columns if c in wanted]]
+        hearings = self._hearings[[c for c in self._hearings.columns if c in wanted]]
+        return Dataset(self.version, cases, hearings, base_key=self.base_key,
+                       deltas=self.deltas, columns=columns)
+
+
+_datasets = {}
+_summaries = {}                      # version -> landing-page summary
+_in_flight = {}                      # (version, columns) -> Future of the running build
+_datasets_lock = threading.Lock()    # guards the two maps above; never held while building
+_build_lock = threading.RLock()      # builds of different projections run one at a time
+
+_metrics = {
+    "builds": 0,             # builder runs
+    "build_seconds": 0.0,
+    "build_failures": 0,
+    "deduplicated": 0,       # callers served by another caller's build
+    "wait_seconds": 0.0,     # time those callers spent waiting for it
+}
+
+
+def _clean_dataset(base_key, columns) -> Dataset:
+    cases, hearings = load_data(columns)
+    cases = clean_cases(cases)
+    hearings = clean_hearings(hearings)
+    cases = add_hearing_aggregates(cases, hearings, columns)
+    if columns is not None:
+        # clean_cases derives columns the page may not have declared
+        # (disposal_days, filing_year, ...); drop them, so a fresh projection
+        # has the columns of one sliced from the full dataset or from SQLite
+        cases, hearings = _restrict(cases, columns), _restrict(hearings, columns)
+    report_memory("cases", cases)
+    report_memory("hearings", hearings)
+    return Dataset(None, cases, hearings, base_key=base_key, columns=columns)
+
+
+def _apply_deltas(dataset, delta_ids, version, deltas) -> Dataset:
+    """Upsert delta_ids into dataset, returning the dataset for version."""
+    cases, hearings = dataset._cases, dataset._hearings
+    for delta_id in delta_ids:
+        cases_delta, hearings_delta = ingest.read_delta(delta_id)
+        if dataset.columns is not None:
+            cases_delta = _restrict(cases_delta, cases.columns)
+            hearings_delta = _restrict(hearings_delta, hearings.columns)
+        cases, hearings = ingest.upsert_delta(cases, hearings, cases_delta, hearings_delta)
+    return Dataset(version, cases, hearings, base_key=dataset.base_key,
+                   deltas=deltas, columns=dataset.columns)
+
+
+def _restrict(delta, columns):
+    if delta is None:
+        return None
+    return delta[[c for c in delta.columns if c in columns]]
+
+
+def _compute_dataset(version, state, previous, columns) -> Dataset:
+    """
+    Build the dataset for version. When only new deltas were added since
+    previous, they are upserted into it; otherwise the base is rebuilt.
+    """
+    base_key, deltas, _ = state
+    if (
+        previous is not None
+        and previous.base_key == base_key
+        and deltas[:len(previous.deltas)] == previous.deltas
+    ):
+        return _apply_deltas(previous, deltas[len(previous.deltas):], version, deltas)
+    return _apply_deltas(_clean_dataset(base_key, columns), deltas, version, deltas)
+
+
+def _mapped_dataset(version, state, previous) -> Dataset:
+    """Dataset backed by the shared Arrow snapshot, written first if missing."""
+    frames = snapshot.load_snapshot(version)
+    if frames is None:
+        with snapshot.build_lock(version):
+            # Another process may have finished the build while we waited
+            frames = snapshot.load_snapshot(version)
+            if frames is None:
+                dataset = _compute_dataset(version, state, previous, None)
+                snapshot.write_snapshot(version, {
+                    "cases": dataset._cases,
+                    "hearings": dataset._hearings,
+                })
+                # Written after the frames, so a summary implies a snapshot
+                snapshot.write_summary(version, build_summary(dataset._cases))
+                # Drop the private copies in favour of the shared mapping
+                del dataset
+                frames = snapshot.load_snapshot(version)
+    base_key, deltas, _ = state
+    return Dataset(version, frames["cases"], frames["hearings"],
+                   base_key=base_key, deltas=deltas)
+
+
+def _stored(version, columns):
+    """The stored dataset for (version, columns), if ready; caller holds _datasets_lock."""
+    dataset = _datasets.get((version, columns))
+    if dataset is None and columns is not None and (version, None) in _datasets:
+        # Slicing columns off frames already in memory is free
+        dataset = _datasets[(version, None)].project(columns)
+        _datasets[(version, columns)] = dataset
+    return dataset
+
+
+def _lookup(version, columns):
+    with _datasets_lock:
+        return _stored(version, columns)
+
+
+def _build_dataset(version, state, columns) -> Dataset:
+    with _build_lock:
+        # A build of another projection may have finished while we queued
+        dataset = _lookup(version, columns)
+        if dataset is not None:
+            return dataset
+
+        with _datasets_lock:
+            previous = next((ds for (_, cols), ds in _datasets.items() if cols == columns), None)
+        if snapshot.snapshot_enabled():
+            return _mapped_dataset(version, state, previous)
+        return _compute_dataset(version, state, previous, columns)
+
+
+def _shares_full_load():
+    """
+    True when page projections are sliced from the full dataset instead of
+    loaded on their own: it is mapped from the shared snapshot, or a warm-up
+    step (e.g. the SQLite backend) needs it loaded anyway, so the data is
+    held once rather than as the full dataset plus each projection.
+    """
+    return snapshot.snapshot_enabled() or any(columns is None for columns, _ in _warmup_steps)
+
+
+def _dataset_for(version, state, columns) -> Dataset:
+    """
+    Find or build the dataset for (version, columns). Single-flight: one
+    caller builds it, concurrent callers for the same key wait for its result.
+    """
+    if columns is not None and _shares_full_load():
+        # Projections of the full dataset cost no memory of their own.
+        # Resolved here rather than in _build_dataset: waiting on the full
+        # dataset's flight while holding _build_lock deadlocks with its leader.
+        full = _dataset_for(version, state, None)
+        return _lookup(version, columns) or full.project(columns)
+
+    key = (version, columns)
+    with _datasets_lock:
+        dataset = _stored(version, columns)
+        if dataset is not None:
+            return dataset
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+
+    if not leader:
+        start = time.perf_counter()
+        try:
+            return future.result()
+        finally:
+            with _datasets_lock:
+                _metrics["deduplicated"] += 1
+                _metrics["wait_seconds"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    dataset = None
+    try:
+        dataset = _build_dataset(version, state, columns)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _datasets_lock:
+            # Stored before the flight ends, so no caller can miss both
+            if dataset is not None:
+                _datasets[key] = dataset
+                # Only the current version is kept; older frames are released
+                for old in [k for k in _datasets if k[0] != version]:
+                    del _datasets[old]
+            del _in_flight[key]
+            _metrics["builds"] += 1
+            _metrics["build_seconds"] += time.perf_counter() - start
+            _metrics["build_failures"] += dataset is None
+    future.set_result(dataset)
+    return dataset
+
+
+def metrics():
+    """Counters of the shared loading path, including single-flight waits."""
+    with _datasets_lock:
+        return {**_metrics, "in_flight": len(_in_flight)}
+
+
+class WarmupError(RuntimeError):
+    """The background build of the current data version failed."""
+
+
+def _check_warmup(version, projection):
+    with _datasets_lock:
+        error = _warmup_failures.get((version, projection))
+    if error is not None:
+        raise WarmupError(error)
+
+
+def get_dataset(columns=None, wait=True) -> Dataset:
+    """
+    Return the dataset for the current data version, building it if needed.
+    columns declares the cleaned columns a page uses (e.g. disposal_days);
+    only those and their source columns are loaded. With wait=False a
+    dataset that is not ready yet is left to the background warm-up and
+    None is returned instead of blocking; if the warm-up of this data
+    version failed, WarmupError is raised instead of starting it again.
+    """
+    columns = project_columns(columns)
+    state = _source_state()
+    version = data_version(state)
+    if wait:
+        return _dataset_for(version, state, columns)
+    dataset = _lookup(version, columns)
+    if dataset is None:
+        # Only the declared projection is built, as with wait=True
+        _check_warmup(version, columns)
+        start_warmup(columns)
+    return dataset
+
+
+# ----------------------------
+# Landing-page summary
+# ----------------------------
+def _store_summary(dataset):
+    summary = snapshot.load_summary(dataset.version) if snapshot.snapshot_enabled() else None
+    if summary is None:
+        summary = build_summary(dataset.cases)
+    with _datasets_lock:
+        _summaries.clear()
+        _summaries[dataset.version] = summary
+    return summary
+
+
+def get_summary():
+    """
+    The summary of the current data version (see summary.py), or None while
+    it is being built. Only the summary is read - in shared-snapshot mode
+    from the file written with the snapshot - never the court data itself.
+    Raises WarmupError if building it failed for this data version.
+    """
+    version = data_version()
+    with _datasets_lock:
+        summary = _summaries.get(version)
+    if summary is None and snapshot.snapshot_enabled():
+        summary = snapshot.load_summary(version)
+        if summary is not None:
+            with _datasets_lock:
+                _summaries.clear()
+                _summaries[version] = summary
+    if summary is None:
+        _check_warmup(version, project_columns(SUMMARY_COLUMNS))
+        start_warmup(SUMMARY_COLUMNS)
+    return summary
+
+
+# ----------------------------
+# Background warm-up
+# ----------------------------
+# (projection, step): step(dataset) runs once the dataset of that
+# projection is built, e.g. to build indexes (None = every column)
+_warmup_steps = [(project_columns(SUMMARY_COLUMNS), _store_summary)]
+# Projections start_all_warmups() builds: every one a step is registered
+# for, and those pages declare without steps of their own
+_declared_projections = [project_columns(SUMMARY_COLUMNS)]
+_warmup_threads = {}                 # projection -> its warm-up thread
+# (data version, projection) -> error of its failed warm-up. A failure
+# sticks until the data changes, so pages report it instead of retrying.
+_warmup_failures = {}
+
+
+def declare_projection(columns=None):
+    """Have start_all_warmups() build the dataset for columns."""
+    projection = project_columns(columns)
+    if projection not in _declared_projections:
+        _declared_projections.append(projection)
+
+
+def add_warmup_step(step, columns=None):
+    """Run step(dataset) whenever the dataset for columns is warmed up."""
+    _warmup_steps.append((project_columns(columns), step))
+    declare_projection(columns)
+
+
+def _warm(projection):
+    state = _source_state()
+    version = data_version(state)
+    try:
+        dataset = _dataset_for(version, state, projection)
+        for columns, step in _warmup_steps:
+            if columns == projection:
+                step(dataset)
+        print(f"[DATA STORE] warm-up finished for data version {dataset.version}: {metrics()}")
+    except Exception as e:
+        print(f"[DATA STORE] warm-up failed for data version {version}: {e}")
+        with _datasets_lock:
+            for key in [k for k in _warmup_failures if k[0] != version]:
+                del _warmup_failures[key]
+            _warmup_failures[(version, projection)] = f"{type(e).__name__}: {e}"
+
+
+def start_warmup(columns=None):
+    """
+    Build the current dataset for columns (as get_dataset declares them)
+    and its warm-up steps in a background thread, so the first page view
+    does not pay for it. Returns the thread; calling again while that
+    warm-up is running returns the same one.
+    """
+    projection = project_columns(columns)
+    with _datasets_lock:
+        thread = _warmup_threads.get(projection)
+        if thread is None or not thread.is_alive():
+            name = "data-warmup" if projection is None else f"data-warmup-{len(projection)}"
+            thread = threading.Thread(target=_warm, args=(projection,), name=name, daemon=True)
+            _warmup_threads[projection] = thread
+            thread.start()
+        return thread
+
+
+def start_all_warmups():
+    """
+    Start the warm-up of every declared projection, each with its steps,
+    e.g. when the server starts. Returns the warm-up threads.
+    """
+    return [start_warmup(projection) for projection in list(_declared_projections)]
@@ -0,0 +1,86 @@
+# Change-driven data versioning for the data/ directory.
+#
+# Replaces the fixed one-hour TTL: the data version is a fingerprint of every
+# input file (size, mtime and SHA-256), so the store and everything derived
+# from it are rebuilt exactly when an input changes - and only then.
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+# Re-stat the directory at most this often; reruns in between reuse the result
+POLL_INTERVAL = 2.0
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DataWatcher:
+    """
+    Fingerprints the files under root. Content hashes are memoised by
+    (size, mtime), so a poll only re-hashes files whose stat changed, and a
+    touched-but-identical file does not change the version.
+    """
+
+    def __init__(self, root, poll_interval=POLL_INTERVAL):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self._hashes = {}          # relpath -> ((size, mtime_ns), sha256)
+        self._fingerprint = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _input_files(self):
+        if not self.root.exists():
+            return []
+        # Hidden entries hold caches, snapshots and half-written files
+        return sorted(
+            path for path in self.root.rglob("*")
+            if path.is_file()
+            and not any(part.startswith(".") for part in path.relative_to(self.root).parts)
+        )
+
+    def _poll(self):
+        fingerprint = {}
+        for path in self._input_files():
+            rel = path.relative_to(self.root).as_posix()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key = (stat.st_size, stat.st_mtime_ns)
+            cached = self._hashes.get(rel)
+            if cached is None or cached[0] != key:
+                cached = (key, _sha256(path))
+                self._hashes[rel] = cached
+            fingerprint[rel] = cached[1]
+
+        # Forget files that disappeared
+        for rel in set(self._hashes) - set(fingerprint):
+            del self._hashes[rel]
+
+        digest = hashlib.sha256()
+        for rel, sha in fingerprint.items():
+            digest.update(f"{rel}:{sha};".encode())
+        self._fingerprint = fingerprint
+        self._version = digest.hexdigest()[:16]
+
+    def check(self, force=False):
+        """Re-fingerprint the directory if the poll interval has elapsed."""
+        with self._lock:
+            now = time.monotonic()
+            if force or self._version is None or now - self._checked_at >= self.poll_interval:
+                self._poll()
+                self._checked_at = now
+            return self._version, dict(self._fingerprint)
+
+    def version(self, force=False) -> str:
+        return self.check(force)[0]
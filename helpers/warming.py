@@ -0,0 +1,50 @@
+import streamlit as st
+
+from data_store import WarmupError, get_dataset
+import page_data  # starts every page's warm-up on the first import
+
+# How often a waiting page checks the warm-up again
+RETRY_SECONDS = 2
+
+
+@st.fragment(run_every=RETRY_SECONDS)
+def _poll(ready):
+    # Reruns on its own timer in the browser session; the script thread
+    # has long finished, so nothing sleeps while the warm-up runs
+    try:
+        done = ready()
+    except WarmupError:
+        done = True      # the page rerun reports the error
+    if done:
+        st.rerun()
+
+
+def rerun_when_ready(ready):
+    """
+    Rerun the page once ready() is true (or raises WarmupError), checking
+    every RETRY_SECONDS from a fragment instead of sleeping in the script.
+    """
+    _poll(ready)
+
+
+def show_warmup_error(error):
+    """Report a failed data build and stop the page."""
+    st.error(f"The court data could not be loaded: {error}")
+    st.stop()
+
+
+def dataset_or_warming(columns=None):
+    """
+    The dataset for columns if it is ready. Otherwise show a short notice
+    while the background warm-up runs and rerun the page when it is done.
+    If the warm-up failed, show the error and stop instead of retrying.
+    """
+    try:
+        dataset = get_dataset(columns, wait=False)
+    except WarmupError as e:
+        show_warmup_error(e)
+    if dataset is None:
+        st.info("Preparing the latest court data… this page will refresh automatically.")
+        rerun_when_ready(lambda: get_dataset(columns, wait=False) is not None)
+        st.stop()
+    return dataset
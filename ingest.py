@@ -0,0 +1,164 @@
+# Incremental ingest of NJDG delta extracts.
+#
+# A delta is a CSV of new or changed cases and/or hearings. Ingesting it
+# copies it into data/deltas/ (which bumps the data version) and upserts the
+# rows into the cleaned frames - cases by cnr_number, hearings by
+# (cnr_number, business_on_date) - touching only the affected CNRs instead of
+# re-reading the whole extract.
+#
+# Usage: python ingest.py --cases new_cases.csv --hearings new_hearings.csv
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from preprocessing import (
+    clean_cases, clean_hearings, concat_frames, add_hearing_aggregates,
+    HEARING_AGGREGATE_COLUMNS,
+)
+
+DELTA_DIR = Path(__file__).parent / "data" / "deltas"
+
+
+def list_deltas():
+    """Ids of the recorded deltas, oldest first."""
+    if not DELTA_DIR.exists():
+        return ()
+    ids = {path.name.split("_", 1)[0] for path in DELTA_DIR.glob("*_*.csv")}
+    return tuple(sorted(ids))
+
+
+def delta_files(delta_id):
+    """(cases_path, hearings_path) for a recorded delta; either may be None."""
+    cases_path = DELTA_DIR / f"{delta_id}_cases.csv"
+    hearings_path = DELTA_DIR / f"{delta_id}_hearings.csv"
+    return (
+        cases_path if cases_path.exists() else None,
+        hearings_path if hearings_path.exists() else None,
+    )
+
+
+def read_delta(delta_id):
+    """Cleaned (cases, hearings) rows of one delta; either may be None."""
+    cases_path, hearings_path = delta_files(delta_id)
+    cases = clean_cases(pd.read_csv(cases_path)) if cases_path else None
+    hearings = clean_hearings(pd.read_csv(hearings_path)) if hearings_path else None
+    return cases, hearings
+
+
+def _append_hearings(hearings, delta):
+    """
+    Add delta's hearings to the history. Recorded hearings with the same
+    (cnr_number, business_on_date) as a dated delta hearing are replaced by
+    it; every other recorded hearing is kept, including same-day and undated
+    ones. The touched cases are moved to the end, each still in date order,
+    so hearings stay grouped.
+    """
+    changed = hearings["cnr_number"].isin(delta["cnr_number"])
+    key = [c for c in ("cnr_number", "business_on_date") if c in delta.columns]
+    recorded = hearings[changed]
+    if len(key) == 2 and key[1] in recorded.columns:
+        dated = delta[delta[key[1]].notna()]
+        replaced = pd.MultiIndex.from_frame(recorded[key]).isin(pd.MultiIndex.from_frame(dated[key]))
+        recorded = recorded[~replaced]
+    history = concat_frames([recorded, delta])
+    history = history.sort_values(key, kind="stable")
+    return concat_frames([hearings[~changed], history])
+
+
+def _refresh_cases(cases, hearings, touched, cases_delta):
+    """
+    Replace the touched cases with their delta rows (if any) and recompute
+    their hearing aggregates from the updated history.
+    """
+    aggregates = [c for c in HEARING_AGGREGATE_COLUMNS if c in cases.columns]
+    changed = cases["cnr_number"].isin(touched)
+    rows = cases[changed].drop(columns=aggregates)
+    if cases_delta is not None and len(cases_delta):
+        delta = cases_delta.drop_duplicates(subset="cnr_number", keep="last")
+        rows = concat_frames([rows[~rows["cnr_number"].isin(delta["cnr_number"])], delta])
+    if aggregates:
+        history = hearings[hearings["cnr_number"].isin(touched)]
+        rows = add_hearing_aggregates(rows, history, aggregates)
+    return concat_frames([cases[~changed], rows[cases.columns.intersection(rows.columns)]])
+
+
+def upsert_delta(cases, hearings, cases_delta, hearings_delta):
+    """
+    Apply one cleaned delta to the cleaned frames. disposal_days and
+    filing_year were derived by clean_cases for the delta rows only, and
+    the hearing aggregates are recomputed for the touched CNRs only.
+    Returns the new (cases, hearings).
+    """
+    touched = set()
+    if hearings_delta is not None and len(hearings_delta):
+        hearings = _append_hearings(hearings, hearings_delta)
+        touched.update(hearings_delta["cnr_number"])
+    if cases_delta is not None and len(cases_delta):
+        touched.update(cases_delta["cnr_number"])
+    if touched:
+        cases = _refresh_cases(cases, hearings, touched, cases_delta)
+
+    print(f"[INGEST] upserted {len(touched):,} CNRs")
+    return cases, hearings
+
+
+def _reserve_delta_id():
+    """
+    Claim the next delta id by creating its marker file with O_EXCL, so two
+    concurrent ingests never copy their files under the same id.
+    """
+    DELTA_DIR.mkdir(parents=True, exist_ok=True)
+    taken = {path.name.split("_", 1)[0] for path in DELTA_DIR.glob("*_*.csv")}
+    taken |= {path.stem for path in DELTA_DIR.glob("*.id")}
+    n = max((int(i) for i in taken), default=0) + 1
+    while True:
+        delta_id = f"{n:04d}"
+        try:
+            os.close(os.open(DELTA_DIR / f"{delta_id}.id", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return delta_id
+        except FileExistsError:
+            n += 1
+
+
+def record_delta(cases_path=None, hearings_path=None):
+    """Copy delta CSVs into data/deltas/ under the next id and return that id."""
+    if cases_path is None and hearings_path is None:
+        raise ValueError("Nothing to ingest: pass a cases and/or hearings CSV.")
+
+    delta_id = _reserve_delta_id()
+
+    # Copy to a temporary name first so a half-written delta is never listed
+    for kind, source in (("cases", cases_path), ("hearings", hearings_path)):
+        if source is not None:
+            target = DELTA_DIR / f"{delta_id}_{kind}.csv"
+            tmp = DELTA_DIR / f".{delta_id}_{kind}.tmp"
+            shutil.copyfile(source, tmp)
+            tmp.replace(target)
+    return delta_id
+
+
+def ingest_delta(cases_path=None, hearings_path=None):
+    """
+    Record a delta and bring this process's data store up to date with it.
+    Other server processes pick the delta up on their next get_dataset().
+    Returns the new data version.
+    """
+    from data_store import check_for_changes, get_dataset
+
+    delta_id = record_delta(cases_path, hearings_path)
+    check_for_changes()
+    dataset = get_dataset()
+    print(f"[INGEST] delta {delta_id} ingested, data version {dataset.version}")
+    return dataset.version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a delta NJDG extract.")
+    parser.add_argument("--cases", type=Path, help="CSV of new or changed cases")
+    parser.add_argument("--hearings", type=Path, help="CSV of new or changed hearings")
+    args = parser.parse_args()
+    ingest_delta(args.cases, args.hearings)
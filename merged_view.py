@@ -0,0 +1,168 @@
+# Lazy view of merge_data(cases, hearings).
+#
+# The merged frame repeats every case column on every hearing row, while
+# pages use a handful of its columns. LazyMerged keeps only the join mapping
+# (hearing row -> case row, from the case -> hearings offset index) and
+# resolves column selections, filters and value_counts through it,
+# materialising just the columns and rows asked for.
+
+import numpy as np
+import pandas as pd
+
+from case_index import case_hearings
+from preprocessing import take_column
+
+
+class LazyMerged:
+    """
+    index.hearings LEFT JOIN index.cases, named like merge_data (clashing
+    hearing columns get suffixes[0], case columns suffixes[1]), restricted
+    to rows - positions into index.hearings, all of them if None. Rows are
+    in the index's hearing order, i.e. grouped by case.
+    """
+
+    def __init__(self, index, rows=None, suffixes=("_x", "_y")):
+        cases = index.cases
+        if cases[index.case_key].duplicated().any():
+            raise ValueError(f"cases have duplicate {index.case_key} values; a lazy merge needs unique keys")
+        self.index = index
+        self.rows = rows
+        self.suffixes = suffixes
+
+        # Output column -> (frame, source column), in merge column order
+        shared_key = index.case_key == index.hearing_key
+        self._sources = {}
+        for col in index.hearings.columns:
+            clash = col in cases.columns and not (shared_key and col == index.hearing_key)
+            self._sources[col + suffixes[0] if clash else col] = ("hearings", col)
+        for col in cases.columns:
+            if shared_key and col == index.case_key:
+                continue
+            clash = col in index.hearings.columns
+            self._sources[col + suffixes[1] if clash else col] = ("cases", col)
+
+    # ----------------------------
+    # Shape
+    # ----------------------------
+    @property
+    def columns(self):
+        return list(self._sources)
+
+    def __contains__(self, name):
+        return name in self._sources
+
+    def __len__(self):
+        return len(self.index.hearings) if self.rows is None else len(self.rows)
+
+    def _row_positions(self):
+        return np.arange(len(self.index.hearings)) if self.rows is None else self.rows
+
+    def _row_cases(self):
+        case_of = self.index.hearing_cases
+        return case_of if self.rows is None else case_of[self.rows]
+
+    def _with_rows(self, rows):
+        view = LazyMerged.__new__(LazyMerged)
+        view.__dict__.update(self.__dict__)
+        view.rows = np.asarray(rows, dtype=np.intp)
+        return view
+
+    # ----------------------------
+    # Materialisation
+    # ----------------------------
+    def column(self, name) -> pd.Series:
+        """One merged column for the current rows."""
+        frame, col = self._sources[name]
+        if frame == "hearings":
+            series = self.index.hearings[col]
+            values = series.array if self.rows is None else take_column(series, self.rows, False)
+        else:
+            case_of = self._row_cases()
+            values = take_column(self.index.cases[col], case_of, allow_fill=bool((case_of < 0).any()))
+        return pd.Series(values, index=pd.RangeIndex(len(self)), name=name, dtype=values.dtype, copy=False)
+
+    def select(self, columns) -> pd.DataFrame:
+        """The given merged columns for the current rows."""
+        return pd.DataFrame({name: self.column(name) for name in columns}, copy=False)
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.column(item)
+        return self.select(item)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.select(self.columns)
+
+    # ----------------------------
+    # Row selection
+    # ----------------------------
+    def take(self, hearing_rows) -> "LazyMerged":
+        """The rows of the hearings at positions hearing_rows, e.g. from an index."""
+        return self._with_rows(np.sort(np.asarray(hearing_rows, dtype=np.intp)))
+
+    def filter(self, mask) -> "LazyMerged":
+        """Rows where mask (aligned with the current rows) is true."""
+        picked = np.flatnonzero(pd.Series(mask).fillna(False).to_numpy(dtype=bool))
+        return self._with_rows(self._row_positions()[picked])
+
+    def filter_cases(self, case_mask) -> "LazyMerged":
+        """Rows whose case satisfies case_mask (aligned with index.cases)."""
+        case_mask = pd.Series(case_mask).fillna(False).to_numpy(dtype=bool)
+        case_of = self._row_cases()
+        return self.filter((case_of >= 0) & case_mask[np.maximum(case_of, 0)])
+
+    def latest(self) -> "LazyMerged":
+        """
+        The last row of each case. Hearings are grouped by case in date
+        order, so that is each case's latest hearing.
+        """
+        rows = self._row_positions()
+        keys = self.index.hearings[self.index.hearing_key].to_numpy()[rows]
+        codes, _ = pd.factorize(keys, use_na_sentinel=False)
+        last = np.r_[codes[1:] != codes[:-1], True] if len(codes) else np.zeros(0, bool)
+        return self._with_rows(rows[last])
+
+    # ----------------------------
+    # Aggregation
+    # ----------------------------
+    def value_counts(self, name, dropna=True) -> pd.Series:
+        """
+        merged[name].value_counts() for the current rows. A case column is
+        counted on cases, weighted by each case's number of rows, instead of
+        being repeated onto every hearing.
+        """
+        frame, col = self._sources[name]
+        if frame == "hearings":
+            return self.column(name).value_counts(dropna=dropna)
+
+        case_of = self._row_cases()
+        weights = np.bincount(case_of[case_of >= 0], minlength=len(self.index.cases))
+        source = self.index.cases[col]
+        if isinstance(source.dtype, pd.CategoricalDtype):
+            # Like value_counts, list every category, including unused ones
+            codes = source.cat.codes.to_numpy()
+            uniques = pd.CategoricalIndex(source.cat.categories, dtype=source.dtype)
+        else:
+            codes, uniques = pd.factorize(source)
+        present = codes >= 0
+        counts = np.bincount(codes[present], weights=weights[present], minlength=len(uniques))
+        counts = pd.Series(counts.astype(np.int64), index=pd.Index(uniques, name=name), name="count")
+        if not isinstance(source.dtype, pd.CategoricalDtype):
+            counts = counts[counts > 0]
+        if not dropna:
+            missing = int(weights[~present].sum()) + int((case_of < 0).sum())
+            if missing:
+                counts = pd.Series(
+                    np.r_[counts.to_numpy(), missing], index=counts.index.insert(len(counts), np.nan),
+                    name="count",
+                )
+        return counts.sort_values(ascending=False, kind="stable")
+
+
+def merged_view(dataset, case_key="cnr_number", hearing_key="cnr_number",
+                suffixes=("_x", "_y")) -> LazyMerged:
+    """The LazyMerged view of dataset, built once per data version."""
+    return dataset.derived(
+        f"merged_view:{case_key}:{hearing_key}:{':'.join(suffixes)}",
+        lambda ds: LazyMerged(case_hearings(ds, case_key, hearing_key), suffixes=suffixes),
+    )
@@ -41,5 +41,7 @@ else:
 
     # Add simple evaluation metric
     from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
+    # Pending cases have no disposal time to score against
+    scored = cases["disposal_days"].notna()
+    mae = mean_absolute_error(cases.loc[scored, "disposal_days"], cases.loc[scored, "predicted_disposal"])
     st.success(f"Mean Absolute Error: {mae:.2f} days")
\ No newline at end of file
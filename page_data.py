@@ -0,0 +1,96 @@
+# The data each page reads, declared in one place.
+#
+# A page asks the data store for a projection (the cleaned columns it uses)
+# and builds per-version artifacts on it - indexes, the lazy merged view,
+# the Analytics cube. Declaring both here lets the data store build all of
+# them in the background as soon as the server starts, so the first
+# visitor of a page finds them ready instead of waiting for its build.
+
+from case_index import case_hearings
+from cube import analytics_cube
+from data_store import add_warmup_step, declare_projection, start_all_warmups
+from merged_view import merged_view
+from search_index import advocate_index, judge_index
+import query_backend  # registers the SQLite build on the full dataset, when enabled
+
+ANALYTICS_COLUMNS = [
+    "cnr_number", "filing_year", "disposal_days", "remappedstages", "current_status",
+    "before_honourable_judges", "before_hon_judge", "njdg_judge_name",
+]
+
+# The Judge dashboard joins on the first key present on each side
+JUDGE_CASE_KEYS = ['combined_case_number', 'cnr_number', 'case_number']
+JUDGE_HEARING_KEYS = ['combinedcasenumber', 'cnr_number', 'case_number']
+JUDGE_COLUMNS = JUDGE_CASE_KEYS + JUDGE_HEARING_KEYS + [
+    "current_status", "date_filed", "decision_date", "nature_of_disposal",
+    "disposaltime_adj", "disposal_year", "nexthearingdate", "appearancedate",
+    "previoushearing", "purposeofhearing", "beforehonourablejudges", "njdg_judge_name",
+]
+JUDGE_NAME_COLUMNS = ['beforehonourablejudges', 'njdg_judge_name']
+
+LAWYER_COLUMNS = [
+    "cnr_number", "case_number", "case_type", "current_status", "date_filed",
+    "decision_date", "nexthearingdate", "petitioneradvocate", "respondentadvocate",
+]
+
+LOGIN_COLUMNS = ["cnr_number", "beforehonourablejudges", "petitioneradvocate", "respondentadvocate"]
+
+# AI Predictions and ML Models
+PREDICTION_COLUMNS = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
+
+
+# ----------------------------
+# Artifacts
+# ----------------------------
+def judge_keys(dataset):
+    """(case key, hearing key) the Judge dashboard joins on; None where missing."""
+    left_key = next((k for k in JUDGE_CASE_KEYS if k in dataset.cases.columns), None)
+    right_key = next((k for k in JUDGE_HEARING_KEYS if k in dataset.hearings.columns), None)
+    return left_key, right_key
+
+
+def judge_lookup(dataset, left_key, right_key):
+    """
+    (merged view, judge index, judge column) of the Judge dashboard: the
+    hearings LEFT JOIN cases view on its keys and the judge index over the
+    same hearings. The index is None when no judge column is present.
+    """
+    view = merged_view(dataset, left_key, right_key, suffixes=('_hear', '_case'))
+    judge_col = next((c for c in JUDGE_NAME_COLUMNS if c in view), None)
+    if judge_col is None:
+        return view, None, None
+    judges = judge_index(
+        dataset, judge_col,
+        frame=lambda ds: case_hearings(ds, left_key, right_key).hearings,
+        frame_name=f"case_hearings:{left_key}:{right_key}",
+    )
+    return view, judges, judge_col
+
+
+def _warm_judge(dataset):
+    left_key, right_key = judge_keys(dataset)
+    if left_key and right_key:
+        judge_lookup(dataset, left_key, right_key)
+
+
+def _warm_lawyer(dataset):
+    advocate_index(dataset)
+    case_hearings(dataset)
+
+
+def _warm_login(dataset):
+    if "beforehonourablejudges" in dataset.hearings.columns:
+        judge_index(dataset, "beforehonourablejudges")
+    advocate_index(dataset)
+
+
+add_warmup_step(analytics_cube, ANALYTICS_COLUMNS)
+add_warmup_step(_warm_judge, JUDGE_COLUMNS)
+add_warmup_step(_warm_lawyer, LAWYER_COLUMNS)
+add_warmup_step(_warm_login, LOGIN_COLUMNS)
+declare_projection(PREDICTION_COLUMNS)
+
+
+# Every page imports this module, so the first page run in a process - or
+# serve.py, at server start - starts building all of it in the background
+start_all_warmups()
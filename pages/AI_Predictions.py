@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-from preprocessing import load_data, clean_cases
+from helpers.warming import dataset_or_warming
+from page_data import PREDICTION_COLUMNS
 from helpers.sidebar import render_sidebar
+from charts import DEFAULT_MAX_POINTS, bucket_comparison, downsample
 
 st.set_page_config(
     page_title="AI Predictions",
@@ -25,11 +27,10 @@ render_sidebar()
 
 st.title("AI predictions")
 
-# Load and clean data
-cases, hearings = load_data()
-cases = clean_cases(cases)
+required_cols = PREDICTION_COLUMNS
 
-required_cols = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
+# Cleaned cases from the shared data store, only the columns used here
+cases = dataset_or_warming(required_cols).cases
 missing = [col for col in required_cols if col not in cases.columns]
 
 if missing:
@@ -52,9 +53,29 @@ else:
         .head(20)
     )
 
-    # Line chart comparison
-    st.line_chart(cases[["disposal_days", "predicted_disposal"]])
+    # Only a bounded number of points is sent to the browser
+    st.subheader("Predicted vs Actual")
+    view = st.radio(
+        "Chart view",
+        ["By predicted bucket", "Sorted by actual", "By case"],
+        horizontal=True,
+    )
+    if view == "By predicted bucket":
+        buckets = st.slider("Buckets", 5, 100, 20)
+        comparison = bucket_comparison(cases["disposal_days"], cases["predicted_disposal"], buckets)
+        st.line_chart(comparison.set_index("predicted")[["actual"]].rename(
+            columns={"actual": "mean disposal_days"}))
+        st.caption("Mean actual disposal days of the cases in each predicted-disposal bucket.")
+    else:
+        max_points = st.slider("Chart points", 200, 5000, DEFAULT_MAX_POINTS, step=100)
+        method = st.selectbox("Downsampling", ["lttb", "minmax"])
+        series = cases[["disposal_days", "predicted_disposal"]]
+        if view == "Sorted by actual":
+            series = series.sort_values("disposal_days", kind="stable").reset_index(drop=True)
+        st.line_chart(downsample(series, list(series.columns), max_points, method))
 
     from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
-    st.success(f"Mean Absolute Error: {mae:.2f} days")
+    # Pending cases have no disposal time to score against
+    scored = cases["disposal_days"].notna()
+    mae = mean_absolute_error(cases.loc[scored, "disposal_days"], cases.loc[scored, "predicted_disposal"])
+    st.success(f"Mean Absolute Error: {mae:.2f} days")
@@ -1,7 +1,9 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from helpers.warming import dataset_or_warming
+from cube import JUDGE_COLUMNS, analytics_cube
+from page_data import ANALYTICS_COLUMNS
+from charts import cached_figure, histogram_figure
 from helpers.sidebar import render_sidebar
 
 st.set_page_config(
@@ -64,14 +66,16 @@ st.markdown("""
 
 render_sidebar()
 
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-merged = merge_data(cases, hearings)
+# Only the columns the cube is built from
+dataset = dataset_or_warming(ANALYTICS_COLUMNS)
+# Pre-aggregated cells, built once per data version; every tab below is a
+# slice of the cube for the selected years
+cube = analytics_cube(dataset)
+
 
 st.sidebar.header("Filters")
 
-years = sorted(cases["filing_year"].dropna().unique())
+years = cube.years
 
 selected_years = st.sidebar.multiselect(
     "Select Filing Years",
@@ -79,38 +83,21 @@ selected_years = st.sidebar.multiselect(
     default=years  # show all by default
 )
 
-filtered_cases = (
-    cases[cases["filing_year"].isin(selected_years)]
-    if selected_years else cases
-)
 
-filtered_merged = (
-    merged[merged["filing_year"].isin(selected_years)]
-    if selected_years and "filing_year" in merged.columns else merged
-)
+def chart(chart_id, build):
+    """build()'s figure, reused while the data version and years are unchanged."""
+    return cached_figure(dataset.version, chart_id, {"years": selected_years}, build)
 
-# Join hearings with cases to get filing_year
-if "case_id" in hearings.columns and "case_id" in cases.columns:
-    hearings_with_year = hearings.merge(
-        cases[["case_id", "filing_year"]],
-        on="case_id",
-        how="left"
-    )
-    filtered_hearings = (
-        hearings_with_year[hearings_with_year["filing_year"].isin(selected_years)]
-        if selected_years else hearings_with_year
-    )
-else:
-    filtered_hearings = hearings
 
 st.title("Analytics Dashboard")
 
 col1, col2, col3, col4 = st.columns(4)
 
-total_civil = len(filtered_cases)
+totals = cube.totals(selected_years)
+total_civil = totals["cases"]
 total_criminal = 0
 total_cases = total_civil + total_criminal
-older_than_1yr = len(filtered_cases[filtered_cases["disposal_days"] > 365])
+older_than_1yr = totals["over_365"]
 
 col1.metric("Total Civil Cases", total_civil)
 col2.metric("Total Criminal Cases", total_criminal)
@@ -129,19 +116,23 @@ tab1, tab2, tab3, tab4 = st.tabs([
 # TAB 1 — Case Funnel
 with tab1:
     st.subheader("Case Stage Funnel")
-    if "remappedstages" in filtered_merged.columns:
-        funnel_df = filtered_merged["remappedstages"].value_counts().reset_index()
-        funnel_df.columns = ["Stage", "Count"]
-
-        custom_dark_blues = ["#08306b", "#08519c", "#2171b5", "#4292c6", "#6baed6", "#9ecae1"]
-
-        fig = px.funnel(
-            funnel_df,
-            x="Count",
-            y="Stage",
-            color="Stage",
-            color_discrete_sequence=custom_dark_blues
-        )
+    if "remappedstages" in dataset.hearings.columns:
+        def funnel():
+            # Each case counts once, at the stage of its latest hearing
+            funnel_df = cube.stage_counts(selected_years).reset_index()
+            funnel_df.columns = ["Stage", "Count"]
+
+            custom_dark_blues = ["#08306b", "#08519c", "#2171b5", "#4292c6", "#6baed6", "#9ecae1"]
+
+            return px.funnel(
+                funnel_df,
+                x="Count",
+                y="Stage",
+                color="Stage",
+                color_discrete_sequence=custom_dark_blues
+            )
+
+        fig = chart("stage_funnel", funnel)
         st.plotly_chart(fig, width='stretch')
     else:
         st.warning("Column 'remappedstages' not found in merged data.")
@@ -150,27 +141,25 @@ with tab1:
 with tab2:
     st.subheader("Disposal Time by Filing Year")
 
-    if "filing_year" in filtered_cases.columns and "disposal_days" in filtered_cases.columns:
-        filtered_cases["filing_year"] = filtered_cases["filing_year"].astype(int)
+    if "filing_year" in dataset.cases.columns and "disposal_days" in dataset.cases.columns:
+        def disposal_trend():
+            trend = cube.disposal_by_year(selected_years)
 
-        trend = (
-            filtered_cases.groupby("filing_year")["disposal_days"]
-            .mean()
-            .reset_index()
-        )
+            trend["filing_year"] = trend["filing_year"].astype(str)
 
-        trend["filing_year"] = trend["filing_year"].astype(str)
+            fig = px.line(
+                trend,
+                x="filing_year",
+                y="disposal_days",
+                markers=True,
+                title="Average Disposal Days per Filing Year"
+            )
 
-        fig = px.line(
-            trend,
-            x="filing_year",
-            y="disposal_days",
-            markers=True,
-            title="Average Disposal Days per Filing Year"
-        )
+            # Force categorical axis
+            fig.update_xaxes(type="category")
+            return fig
 
-        # Force categorical axis
-        fig.update_xaxes(type="category")
+        fig = chart("disposal_trend", disposal_trend)
 
         st.plotly_chart(fig, width='stretch')
     else:
@@ -180,31 +169,25 @@ with tab2:
 with tab3:
     st.subheader("Judge Hearing Workload")
 
-    judge_col_candidates = [
-        "before_honourable_judges",
-        "before_hon_judge",
-        "njdg_judge_name"
-    ]
     judge_col = next(
-        (col for col in judge_col_candidates if col in filtered_hearings.columns),
+        (col for col in JUDGE_COLUMNS if col in dataset.hearings.columns),
         None
     )
 
     if judge_col:
-        judge_df = (
-            filtered_hearings[judge_col]
-            .value_counts()
-            .reset_index()
-        )
-        judge_df.columns = ["Judge", "Hearings"]
-
-        fig = px.bar(
-            judge_df,
-            x="Judge",
-            y="Hearings",
-            title="Hearings per Judge (Filtered by Year)",
-            color="Hearings"
-        )
+        def judge_workload():
+            judge_df = cube.judge_hearings(selected_years).reset_index()
+            judge_df.columns = ["Judge", "Hearings"]
+
+            return px.bar(
+                judge_df,
+                x="Judge",
+                y="Hearings",
+                title="Hearings per Judge (Filtered by Year)",
+                color="Hearings"
+            )
+
+        fig = chart("judge_workload", judge_workload)
         st.plotly_chart(fig, width='stretch')
     else:
         st.warning("No judge column found.")
@@ -213,13 +196,13 @@ with tab3:
 with tab4:
     st.subheader("Distribution of Disposal Days")
 
-    if "disposal_days" in filtered_cases.columns:
-        fig = px.histogram(
-            filtered_cases,
-            x="disposal_days",
-            nbins=40,
-            title="Disposal Time Distribution"
-        )
+    if "disposal_days" in dataset.cases.columns:
+        def disposal_histogram():
+            # Fixed bins stored in the cube; only the bin counts reach the browser
+            counts, edges = cube.histogram(selected_years)
+            return histogram_figure(counts, edges, "disposal_days", title="Disposal Time Distribution")
+
+        fig = chart("disposal_histogram", disposal_histogram)
         st.plotly_chart(fig, width='stretch')
     else:
         st.warning("No disposal days column found.")
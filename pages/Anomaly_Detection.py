@@ -6,6 +6,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from pathlib import Path
 from helpers.sidebar import render_sidebar
+from charts import bin_counts, histogram_figure
 
 st.set_page_config(
     page_title="Anomaly Detection",
@@ -124,11 +125,10 @@ def run_dashboard():
 
     # Histogram of anomaly scores
     st.subheader("Distribution of Anomaly Scores")
-    fig, ax = plt.subplots(figsize=(5,3))
-    sns.histplot(cases["Anomaly_Score"], bins=30, kde=True, color="blue", ax=ax)
-    ax.set_xlabel("Anomaly Score")
-    ax.set_ylabel("Frequency")
-    st.pyplot(fig)
+    # Binned on the server; only the bin counts reach the browser
+    counts, edges = bin_counts(cases["Anomaly_Score"], bins=30)
+    fig = histogram_figure(counts, edges, "Anomaly Score", y_label="Frequency", color="blue")
+    st.plotly_chart(fig, width='stretch')
 
     # Scatter plot: Case Duration vs Disposal Days
     if "Case_Duration" in cases.columns and "disposal_days" in cases.columns:
@@ -2,8 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_cookies_manager import EncryptedCookieManager
-from preprocessing import load_data, clean_cases, clean_hearings
+from query_backend import get_backend
+from page_data import JUDGE_COLUMNS, judge_keys, judge_lookup
 from helpers.sidebar import render_sidebar
+from helpers.warming import dataset_or_warming
+from charts import cached_figure
 from sessions import validate_token
 
 st.set_page_config(
@@ -66,38 +69,17 @@ if st.session_state.get("is_first_login"):
     
 render_sidebar()
 
-# Load & Preprocess Data
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-
-# Normalize column names
-cases.columns = cases.columns.str.strip().str.lower()
-hearings.columns = hearings.columns.str.strip().str.lower()
-
 # ----------------------------
-# Merge Cases & Hearings
+# Cases & Hearings
 # ----------------------------
-case_keys = ['combined_case_number', 'cnr_number', 'case_number']
-hearing_keys = ['combinedcasenumber', 'cnr_number', 'case_number']
+dataset = dataset_or_warming(JUDGE_COLUMNS)
 
-left_key = next((k for k in case_keys if k in cases.columns), None)
-right_key = next((k for k in hearing_keys if k in hearings.columns), None)
+left_key, right_key = judge_keys(dataset)
 
 if not left_key or not right_key:
     st.error("Could not find valid merge key.")
     st.stop()
 
-merged = pd.merge(
-    cases,
-    hearings,
-    left_on=left_key,
-    right_on=right_key,
-    how='left',
-    suffixes=('_case', '_hear')
-)
-
-merged['judge'] = merged.get('beforehonourablejudges', merged.get('njdg_judge_name', 'unknown'))
 
 # ----------------------------
 # Judge Context
@@ -107,13 +89,38 @@ if not judge_name:
     st.error("Judge name not found in session. Please log in again.")
     st.stop()
 
-judge_cases = merged[merged['judge'].str.upper() == judge_name.upper()]
+backend = get_backend(dataset)
+if backend is not None:
+    # Indexed query for this judge's rows only
+    judge_cases = backend.judge_cases(judge_name, left_key, right_key)
+    if judge_cases is None:
+        judge_cases = pd.DataFrame()
+else:
+    # Look the judge up in the judge index (benches included), then resolve
+    # only those hearings and their cases through the lazy merged view
+    view, judges, judge_col = judge_lookup(dataset, left_key, right_key)
+    if judge_col:
+        judge_view = view.take(judges.lookup(judge_name))
+        judge_cases = judge_view.to_frame()
+        judge_cases['judge'] = judge_cases[judge_col]
+        # Case-level views use each case's latest hearing
+        latest = judge_view.latest()
+        judge_case_rows = latest.to_frame()
+        status_counts = latest.value_counts('current_status')
+    else:
+        judge_cases = pd.DataFrame()
+
 if judge_cases.empty:
     st.warning(f"No cases found for Judge: {judge_name}")
     st.stop()
 
 st.success(f"Logged in as *{judge_name}*")
 
+if backend is not None:
+    # judge_cases has a row per hearing; case-level views use each case's latest
+    judge_case_rows = judge_cases.drop_duplicates(subset=left_key, keep="last")
+    status_counts = judge_case_rows['current_status'].value_counts()
+
 
 # ----------------------------
 # Top Navigation (horizontal)
@@ -135,10 +142,10 @@ if page == "Case Management":
 
     status_filter = st.multiselect(
         "Filter by case status:",
-        judge_cases['current_status'].dropna().unique(),
-        default=judge_cases['current_status'].dropna().unique()
+        judge_case_rows['current_status'].dropna().unique(),
+        default=judge_case_rows['current_status'].dropna().unique()
     )
-    filtered_cases = judge_cases[judge_cases['current_status'].isin(status_filter)]
+    filtered_cases = judge_case_rows[judge_case_rows['current_status'].isin(status_filter)]
 
     st.dataframe(filtered_cases[
         ['case_number', 'current_status', 'date_filed', 'decision_date',
@@ -152,17 +159,17 @@ elif page == "Alerts":
     st.header("Alerts")
 
     today = pd.to_datetime("today").normalize()
-    judge_cases['age_days'] = (today - pd.to_datetime(judge_cases['date_filed'], errors='coerce')).dt.days
+    judge_case_rows['age_days'] = (today - pd.to_datetime(judge_case_rows['date_filed'], errors='coerce')).dt.days
 
     st.subheader("Aging Cases (>365 days)")
-    aging = judge_cases[judge_cases['age_days'] > 365]
+    aging = judge_case_rows[judge_case_rows['age_days'] > 365]
     if not aging.empty:
         st.dataframe(aging[['case_number', 'current_status', 'date_filed', 'age_days', 'disposaltime_adj']])
     else:
         st.info("No aging cases found")
 
     st.subheader("Pending Cases")
-    pending = judge_cases[judge_cases['current_status'].str.lower() != 'disposed']
+    pending = judge_case_rows[judge_case_rows['current_status'].str.lower() != 'disposed']
     if not pending.empty:
         st.dataframe(pending[['case_number', 'current_status', 'date_filed', 'disposaltime_adj']])
     else:
@@ -209,15 +216,24 @@ elif page == "Hearing Overview":
 elif page == "Dashboards / Charts":
     st.header("Dashboards & Charts")
 
-    if 'disposal_year' in judge_cases.columns:
-        disposal_trend = judge_cases.groupby('disposal_year').size().reset_index(name='count')
-        fig = px.line(disposal_trend, x='disposal_year', y='count', title="Case Disposal Trend")
-        st.plotly_chart(fig, width='stretch')
+    # Figures depend only on the data version and the judge; reruns reuse them
+    def chart(chart_id, build):
+        return cached_figure(dataset.version, chart_id, {"judge": judge_name}, build)
 
-    fig_status = px.bar(
-        judge_cases.groupby('current_status').size().reset_index(name='count'),
-        x='current_status',
-        y='count',
-        title="Case Status Distribution"
-    )
-    st.plotly_chart(fig_status, width='stretch')
+    if 'disposal_year' in judge_case_rows.columns:
+        def disposal_trend():
+            trend = judge_case_rows.groupby('disposal_year').size().reset_index(name='count')
+            return px.line(trend, x='disposal_year', y='count', title="Case Disposal Trend")
+
+        st.plotly_chart(chart("judge_disposal_trend", disposal_trend), width='stretch')
+
+    def status_distribution():
+        counts = status_counts[status_counts > 0].rename_axis('current_status').reset_index(name='count')
+        return px.bar(
+            counts,
+            x='current_status',
+            y='count',
+            title="Case Status Distribution"
+        )
+
+    st.plotly_chart(chart("judge_status_distribution", status_distribution), width='stretch')
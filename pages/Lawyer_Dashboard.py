@@ -3,8 +3,12 @@ import pandas as pd
 from streamlit_cookies_manager import EncryptedCookieManager
 from sessions import validate_token
 from utils import load_notes, save_notes, load_reminders, save_reminders
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from query_backend import get_backend
+from case_index import case_hearings
+from search_index import advocate_index
 from helpers.sidebar import render_sidebar
+from helpers.warming import dataset_or_warming
+from page_data import LAWYER_COLUMNS
 
 st.set_page_config(
     page_title="Advocate Dashboard",
@@ -66,16 +70,9 @@ if st.session_state.get("is_first_login"):
     
 render_sidebar()
 
-# Load & Preprocess Data
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-merged = merge_data(cases, hearings)
-
-# Normalize column names
-cases.columns = cases.columns.str.strip().str.lower()
-hearings.columns = hearings.columns.str.strip().str.lower()
-merged.columns = merged.columns.str.strip().str.lower()
+# Cleaned & merged data from the shared data store, only the columns used here
+dataset = dataset_or_warming(LAWYER_COLUMNS)
+backend = get_backend(dataset)
 
 # ----------------------------
 # Notes & Reminders Storage
@@ -93,12 +90,15 @@ if not lawyer_name:
     st.stop()
 
 # Filter cases where lawyer appears as petitioner or respondent advocate
-portfolio = merged[
-    merged['petitioneradvocate'].str.contains(lawyer_name, case=False, na=False) |
-    merged['respondentadvocate'].str.contains(lawyer_name, case=False, na=False)
-]
+if backend is not None:
+    portfolio = backend.advocate_portfolio(lawyer_name)
+else:
+    # Find the cases in the advocate index, then join only those to their
+    # hearings; cases without hearings yet are listed too
+    mine = advocate_index(dataset).search(lawyer_name)
+    portfolio = case_hearings(dataset).join(mine)
 
-if portfolio.empty:
+if portfolio is None or portfolio.empty:
     st.warning(f"No cases found for Advocate: {lawyer_name}")
     st.stop()
 
@@ -107,21 +107,30 @@ st.success(f"Logged in as *{lawyer_name}*")
 # Case Portfolio Display
 # ----------------------------
 st.subheader("Your Case Portfolio")
-st.dataframe(portfolio[['cnr_number','case_number','case_type','current_status','date_filed','decision_date','nexthearingdate']])
+# One row per case, from its latest hearing; the search below shows the history
+portfolio_cases = portfolio.drop_duplicates(subset="cnr_number", keep="last")
+st.dataframe(portfolio_cases[['cnr_number','case_number','case_type','current_status','date_filed','decision_date','nexthearingdate']])
 
 # ----------------------------
 # Case Search by CNR Number
 # ----------------------------
 st.subheader("Search Case")
-cnr = st.text_input("Search Case by CNR Number:")
-if cnr:
+query = st.text_input("Search Case by CNR Number (or paste several):")
+cnrs = query.replace(",", " ").split()
+if cnrs:
     if "cnr_number" not in portfolio.columns:
         st.error("'cnr_number' column not found in dataset.")
     else:
-        df = portfolio[portfolio["cnr_number"] == cnr]
+        cnr = cnrs[0]
+        # Hash lookups by CNR, limited to this advocate's own cases
+        index = case_hearings(dataset)
+        own = set(portfolio["cnr_number"])
+        rows = [row for row, c in zip(index.case_rows(cnrs), cnrs) if row >= 0 and c in own]
+        df = index.join(rows)
         if not df.empty:
             st.write(df)
 
+        if not df.empty and len(cnrs) == 1:
             # ----------------------------
             # Personal Notes
             # ----------------------------
@@ -142,8 +151,8 @@ if cnr:
                 reminders[cnr] = str(reminder_date)
                 save_reminders(reminders)
                 st.success(f"Reminder set for {reminder_date}")
-        else:
-            st.warning(f"No case found for CNR Number: {cnr}")
+        elif df.empty:
+            st.warning(f"No case found for CNR Number: {query}")
 
 # ----------------------------
 # Upcoming Reminders Overview
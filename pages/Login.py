@@ -1,10 +1,12 @@
 import streamlit as st
 import warnings
 
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from data_store import WarmupError, get_dataset
+from page_data import LOGIN_COLUMNS
+from query_backend import get_backend
+from search_index import judge_index, advocate_index
 from auth import verify_password, set_password, is_first_login, get_default_password
 from sessions import create_token, validate_token, get_token
-import pandas as pd
 import base64
 from pathlib import Path
 from helpers.sidebar import render_sidebar
@@ -82,19 +84,14 @@ if "authenticated" not in st.session_state:
 # -------------------------------------------------
 # Load Data
 # -------------------------------------------------
-@st.cache_resource
-def load_all_data():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged = merge_data(cases, hearings)
-
-    cases.columns = cases.columns.str.strip().str.lower()
-    hearings.columns = hearings.columns.str.strip().str.lower()
-    merged.columns = merged.columns.str.strip().str.lower()
-    return cases, hearings, merged
-
-cases, hearings, merged = load_all_data()
+# Starts building the login columns in the background if they are not
+# ready; the form renders meanwhile
+try:
+    dataset = get_dataset(LOGIN_COLUMNS, wait=False)
+    load_error = None
+except WarmupError as e:
+    dataset, load_error = None, e
+backend = get_backend(dataset) if dataset is not None else None
 
 # -------------------------------------------------
 # Sidebar
@@ -139,27 +136,37 @@ with right:
             st.error("Please enter your name.")
         elif not password:
             st.error("Please enter your password.")
+        elif load_error is not None:
+            st.error(f"The court data could not be loaded: {load_error}")
+        elif dataset is None:
+            st.info("Court data is still loading. Please try again in a few seconds.")
         else:
-            if not verify_password(name, password, merged):
+            if not verify_password(name, password):
                 st.error("Incorrect password.")
             else:
                 if role == "Judge":
-                    judge_cases = merged[
-                        merged.get("beforehonourablejudges", pd.Series("", index=merged.index))
-                        .str.contains(name, case=False, na=False)
-                    ]
-                    if judge_cases.empty:
+                    if backend is not None:
+                        has_cases = backend.has_judge_cases(name)
+                    elif "beforehonourablejudges" in dataset.hearings.columns:
+                        # Every hearing is a merged row; search the judge index
+                        judges = judge_index(dataset, "beforehonourablejudges")
+                        has_cases = len(judges.search(name)) > 0
+                    else:
+                        has_cases = False
+                    if not has_cases:
                         st.error("No cases found for this Judge.")
                         st.stop()
 
                     st.session_state.user_role = "Judge"
 
                 else:  # Advocate
-                    advocate_cases = merged[
-                        merged["petitioneradvocate"].str.contains(name, case=False, na=False) |
-                        merged["respondentadvocate"].str.contains(name, case=False, na=False)
-                    ]
-                    if advocate_cases.empty:
+                    if backend is not None:
+                        has_cases = backend.has_advocate_cases(name)
+                    else:
+                        # Advocates are case columns: any case counts, with or
+                        # without hearings, as on the Lawyer dashboard
+                        has_cases = len(advocate_index(dataset).search(name)) > 0
+                    if not has_cases:
                         st.error("No cases found for this Advocate.")
                         st.stop()
 
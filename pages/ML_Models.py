@@ -1,14 +1,14 @@
 import streamlit as st
 import pandas as pd
-from preprocessing import load_data, clean_cases
+from helpers.warming import dataset_or_warming
+from page_data import PREDICTION_COLUMNS
 
 st.title("ML Predictions")
 
-# Load and clean data
-cases, hearings = load_data()
-cases = clean_cases(cases)
+required_cols = PREDICTION_COLUMNS
 
-required_cols = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
+# Cleaned cases from the shared data store, only the columns used here
+cases = dataset_or_warming(required_cols).cases
 missing = [col for col in required_cols if col not in cases.columns]
 
 if missing:
@@ -35,5 +35,7 @@ else:
     st.line_chart(cases[["disposal_days", "predicted_disposal"]])
 
     from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
+    # Pending cases have no disposal time to score against
+    scored = cases["disposal_days"].notna()
+    mae = mean_absolute_error(cases.loc[scored, "disposal_days"], cases.loc[scored, "predicted_disposal"])
     st.success(f"Mean Absolute Error: {mae:.2f} days")
\ No newline at end of file
@@ -1,8 +1,23 @@
 import pandas as pd
-import streamlit as st
 import warnings
 import logging
 import os
+import io
+import json
+import hashlib
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:   # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
 os.environ['PYTHONWARNINGS'] = 'ignore::DeprecationWarning'
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -20,11 +35,403 @@ try:
 except:
     pass
 
+# -------------------------------
+# Column schema
+# -------------------------------
+# Low-cardinality text columns are held as categoricals (dictionary-encoded),
+# numerics are downcast and dates are parsed to datetime64 once, when the
+# extract is first read. Names are in normalize_columns() form.
+CATEGORY_COLUMNS = [
+    'current_status', 'case_type', 'nature_of_disposal',
+    'beforehonourablejudges', 'njdg_judge_name',
+    'petitioneradvocate', 'respondentadvocate',
+    'purposeofhearing', 'remappedstages',
+]
+# Integer columns pages compute with (e.g. total_hearings * days per hearing)
+# keep a full-width type; a downcast int8 would overflow in the product
+WIDE_INTEGER_COLUMNS = ['total_hearings', 'filing_year']
+CASE_DATE_COLUMNS = ['date_filed', 'decision_date', 'registration_date']
+HEARING_DATE_COLUMNS = ['businessondate', 'nexthearingdate', 'appearancedate']
+
+# Bump when the schema, cleaned layout or cache manifest changes so stale
+# caches (and snapshots, which are keyed on it too) are rebuilt
+SCHEMA_VERSION = 6
+
+# Columns computed by clean_cases/clean_hearings and the source columns
+# they need, so a page can declare the cleaned columns it uses
+DERIVED_COLUMN_SOURCES = {
+    'disposal_days': ['date_filed', 'decision_date'],
+    'filing_year': ['date_filed'],
+    'business_on_date': ['businessondate'],
+    'first_hearing_date': ['businessondate'],
+    'last_hearing_date': ['businessondate'],
+    'mean_hearing_gap_days': ['businessondate'],
+    'adjournments': ['purposeofhearing'],
+}
+
+# Per-case summaries of the hearing history, stored as columns on cases
+HEARING_AGGREGATE_COLUMNS = [
+    'hearing_count', 'first_hearing_date', 'last_hearing_date',
+    'mean_hearing_gap_days', 'adjournments',
+]
+
+
+def _normalize_name(name):
+    return name.strip().lower().replace(' ', '_')
+
+
+def project_columns(columns):
+    """
+    Expand a page's declared (cleaned) columns to the source columns to read.
+    Returns a sorted tuple usable as a cache key, or None for all columns.
+    cnr_number and the hearing date are always kept since they key the
+    join and the hearing history.
+    """
+    if columns is None:
+        return None
+    wanted = {'cnr_number', 'businessondate', 'business_on_date'}
+    for col in columns:
+        wanted.add(col)
+        wanted.update(DERIVED_COLUMN_SOURCES.get(col, []))
+    return tuple(sorted(wanted))
+
+
+def _select_columns(names, columns):
+    """Raw column names whose normalised form is in columns (all if None)."""
+    if columns is None:
+        return list(names)
+    return [name for name in names if _normalize_name(name) in columns]
+
+
+def frame_memory_mb(df):
+    """Deep memory usage of a frame in MiB."""
+    return df.memory_usage(deep=True).sum() / (1 << 20)
+
+
+def report_memory(name, df, before_mb=None):
+    after_mb = frame_memory_mb(df)
+    if before_mb is None:
+        print(f"[PREPROCESSING] {name}: {len(df):,} rows, {after_mb:,.1f} MB")
+    else:
+        print(f"[PREPROCESSING] {name}: {len(df):,} rows, "
+              f"{before_mb:,.1f} MB -> {after_mb:,.1f} MB")
+
+
+def apply_schema(df, date_columns=(), name=None):
+    """
+    Convert df in place to the explicit schema: categoricals for
+    CATEGORY_COLUMNS, datetime64 for date_columns and downcast numerics
+    (except WIDE_INTEGER_COLUMNS).
+    Columns are matched by their normalised name; already-typed columns
+    are left alone, so this is cheap to call more than once.
+    """
+    before_mb = frame_memory_mb(df) if name else None
+
+    for col in df.columns:
+        key = _normalize_name(col)
+        series = df[col]
+
+        if key in date_columns:
+            df[col] = parse_dates(series, name=key)
+        elif key in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            if key in WIDE_INTEGER_COLUMNS:
+                df[col] = series.astype('int64')
+            else:
+                df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='float')
+
+    if name:
+        report_memory(name, df, before_mb)
+    return df
+
+# -------------------------------
+# Date parsing
+# -------------------------------
+# Extract dates repeat heavily, so each column is parsed once per distinct
+# string with a single format inferred up front, never per row with guessing.
+DATE_FORMAT_CANDIDATES = [
+    '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y', '%m/%d/%Y',
+    '%Y-%m-%d %H:%M:%S', '%d-%m-%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S',
+]
+DATE_FORMAT_SAMPLE_SIZE = 500
+
+
+def infer_date_format(values):
+    """
+    Pick the format that parses the most of a sample of distinct date
+    strings: pandas' guesses (day- then month-first, as NJDG extracts are
+    day-first) then common formats. Returns None if nothing parses.
+    """
+    sample = pd.Index(values[:DATE_FORMAT_SAMPLE_SIZE]).dropna()
+    if len(sample) == 0:
+        return None
+
+    candidates = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for dayfirst in (True, False):
+            guessed = guess_datetime_format(sample[0], dayfirst=dayfirst)
+            if guessed and guessed not in candidates:
+                candidates.append(guessed)
+    candidates += [fmt for fmt in DATE_FORMAT_CANDIDATES if fmt not in candidates]
+
+    best_format, best_parsed = None, 0
+    for fmt in candidates:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best_format, best_parsed = fmt, parsed
+        if parsed == len(sample):
+            break
+    return best_format
+
+
+def parse_dates(series, name=None):
+    """
+    Vectorised replacement for pd.to_datetime(series, errors='coerce'):
+    infers one format per column, parses only the distinct strings and maps
+    the result back through the codes. Reports unparseable values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    uniques = pd.Index(uniques).astype(str)
+
+    fmt = infer_date_format(uniques)
+    if fmt is None:
+        parsed = pd.DatetimeIndex(np.full(len(uniques), np.datetime64('NaT'), 'M8[ns]'))
+    else:
+        parsed = pd.to_datetime(uniques, format=fmt, errors='coerce')
+
+    if len(uniques) == 0:
+        values = np.full(len(series), np.datetime64('NaT'), 'M8[ns]')
+    else:
+        values = parsed.to_numpy().take(codes)
+        values[codes < 0] = np.datetime64('NaT')
+
+    failed = int(np.isnat(values).sum() - (codes < 0).sum())
+    if failed:
+        print(f"[PREPROCESSING] {name or series.name}: {failed:,} values not parseable as {fmt}")
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def concat_frames(frames):
+    """
+    Concatenate frames row-wise without losing categoricals: pd.concat falls
+    back to object when category sets differ, so union them first.
+    """
+    frames = [df for df in frames if df is not None]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    frames = [df.copy(deep=False) for df in frames]
+    for col in frames[0].columns:
+        parts = [df[col] for df in frames if col in df.columns]
+        if not all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            continue
+        categories = pd.api.types.union_categoricals(
+            [part.array for part in parts], ignore_order=True
+        ).categories
+        for df in frames:
+            if col in df.columns:
+                df[col] = df[col].cat.set_categories(categories)
+
+    return pd.concat(frames, ignore_index=True)
+
 # -------------------------------
 # Step 1: Load Data
 # -------------------------------
-@st.cache_data(ttl=3600)   # caches for 1 hour
-def load_data():
+# Parsed CSVs are cached as Parquet next to the source files, keyed by each
+# file's size, mtime and SHA-256 so a restart does not re-tokenise the extract.
+CACHE_DIR_NAME = ".cache"
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_fingerprint(path, with_hash=True):
+    """Size, mtime and (optionally) content hash identifying a source file."""
+    stat = path.stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = _file_sha256(path)
+    return fingerprint
+
+
+def _cache_paths(csv_path):
+    cache_dir = csv_path.parent / CACHE_DIR_NAME
+    return cache_dir / f"{csv_path.stem}.parquet", cache_dir / f"{csv_path.stem}.json"
+
+
+def _cached_frame(csv_path, columns=None):
+    """Return the cached frame for csv_path, or None if the cache is stale."""
+    parquet_path, manifest_path = _cache_paths(csv_path)
+    if not parquet_path.exists() or not manifest_path.exists():
+        return None
+
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+    current = _file_fingerprint(csv_path, with_hash=False)
+    if current["size"] != manifest.get("size"):
+        return None
+    if manifest.get("schema") != SCHEMA_VERSION:
+        return None
+
+    # A touched-but-identical file only costs a re-hash, not a re-parse
+    if current["mtime_ns"] != manifest.get("mtime_ns"):
+        if _file_sha256(csv_path) != manifest.get("sha256"):
+            return None
+        manifest["mtime_ns"] = current["mtime_ns"]
+        try:
+            _write_manifest(manifest_path, manifest)
+        except OSError as e:
+            # The cache is still valid; the next start just re-hashes again
+            print(f"[PREPROCESSING] could not update manifest {manifest_path}: {e}")
+
+    try:
+        # Parquet is columnar: a projection only reads the requested columns
+        return pd.read_parquet(
+            parquet_path, columns=_select_columns(manifest["columns"], columns)
+        )
+    except Exception as e:
+        print(f"[PREPROCESSING] could not read cache {parquet_path}: {e}")
+        return None
+
+
+def _write_manifest(manifest_path, manifest):
+    """
+    Write the manifest to a temp file private to this thread and rename it
+    into place, so a reader never sees a half-written one and concurrent
+    writers do not mix.
+    """
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_cache(csv_path, df, fingerprint):
+    parquet_path, manifest_path = _cache_paths(csv_path)
+    try:
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = parquet_path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+        _write_manifest(manifest_path, fingerprint)
+    except Exception as e:
+        # No pyarrow, read-only data dir, mixed-type object column, ...
+        print(f"[PREPROCESSING] could not write cache for {csv_path.name}: {e}")
+
+
+# Files larger than this are split into byte ranges parsed on a thread pool.
+# pandas' C tokenizer releases the GIL, so threads use the idle cores without
+# pickling frames between processes. Splits happen on line boundaries, which
+# assumes no quoted field spans lines (true of the NJDG extracts).
+PARALLEL_PARSE_MIN_BYTES = 64 << 20
+PARALLEL_PARSE_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+
+def _byte_ranges(csv_path, n_ranges):
+    """Header length and (start, end) byte ranges split on line boundaries."""
+    size = csv_path.stat().st_size
+    with open(csv_path, "rb") as f:
+        f.readline()
+        header_end = f.tell()
+        bounds = [header_end]
+        for i in range(1, n_ranges):
+            f.seek(max(header_end, size * i // n_ranges))
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _parse_range(csv_path, start, end, names, usecols):
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        buffer = f.read(end - start)
+    return pd.read_csv(io.BytesIO(buffer), header=None, names=names, usecols=usecols)
+
+
+def read_csv_parallel(csv_path, usecols=None):
+    """
+    pd.read_csv for large extracts: byte-range chunks are parsed
+    concurrently and concatenated once. Small files are read directly.
+    """
+    if (csv_path.stat().st_size < PARALLEL_PARSE_MIN_BYTES
+            or PARALLEL_PARSE_WORKERS < 2):
+        return pd.read_csv(csv_path, usecols=usecols)
+
+    names = list(pd.read_csv(csv_path, nrows=0).columns)
+    ranges = _byte_ranges(csv_path, PARALLEL_PARSE_WORKERS)
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            chunks = list(pool.map(
+                lambda r: _parse_range(csv_path, r[0], r[1], names, usecols), ranges
+            ))
+    except pd.errors.ParserError as e:
+        print(f"[PREPROCESSING] parallel parse of {csv_path.name} failed ({e}), reading serially")
+        return pd.read_csv(csv_path, usecols=usecols)
+
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_csv_cached(csv_path, date_columns=(), columns=None):
+    """
+    Read a CSV through its Parquet cache, rebuilding the cache if stale.
+    The schema is applied before caching, so cached frames are already typed.
+    columns (normalised names, see project_columns) limits what is returned.
+    """
+    df = _cached_frame(csv_path, columns)
+    if df is not None:
+        return df
+
+    if pyarrow is None and columns is not None:
+        # No cache to fill: parse only the projected columns
+        df = read_csv_parallel(csv_path, usecols=lambda name: _normalize_name(name) in columns)
+        return apply_schema(df, date_columns, name=csv_path.name)
+
+    # The cache always holds every column so any projection can be served
+    fingerprint = _file_fingerprint(csv_path)
+    fingerprint["schema"] = SCHEMA_VERSION
+    df = read_csv_parallel(csv_path)
+    apply_schema(df, date_columns, name=csv_path.name)
+    fingerprint["columns"] = list(df.columns)
+    _write_cache(csv_path, df, fingerprint)
+    return df[_select_columns(df.columns, columns)]
+
+
+def load_data(columns=None):
+    """
+    Load the cases and hearings extracts. columns, if given, is a tuple of
+    normalised source column names (see project_columns) to read from both.
+    Not cached here: data_store keeps the result per data version and the
+    Parquet cache is invalidated by the source files' fingerprints.
+    """
     from pathlib import Path
 
     base_dir = Path(__file__).parent
@@ -32,10 +439,11 @@ def load_data():
     cases_path = base_dir / "data" / "ISDMHack_Cases_students.csv"
     hearings_path = base_dir / "data" / "ISDMHack_Hear_students.csv"
 
-
-
-    cases = pd.read_csv(cases_path)
-    hearings = pd.read_csv(hearings_path)
+    # Both extracts are read at the same time
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        cases = pool.submit(read_csv_cached, cases_path, CASE_DATE_COLUMNS, columns)
+        hearings = pool.submit(read_csv_cached, hearings_path, HEARING_DATE_COLUMNS, columns)
+        cases, hearings = cases.result(), hearings.result()
 
     return cases, hearings
 
@@ -43,7 +451,7 @@ def load_data():
 # Step 2: Normalize column names
 # -------------------------------   
 def normalize_columns(df):
-    df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
+    df.columns = [_normalize_name(c) for c in df.columns]
     return df
 
 # -------------------------------
@@ -60,10 +468,10 @@ def clean_cases(cases):
     }
     cases.rename(columns=col_map, inplace=True)
 
-    # Convert dates safely
-    for col in ['date_filed', 'decision_date', 'registration_date']:
+    # Convert dates safely (no-op for frames already typed by load_data)
+    for col in CASE_DATE_COLUMNS:
         if col in cases.columns:
-            cases[col] = pd.to_datetime(cases[col], errors='coerce')
+            cases[col] = parse_dates(cases[col])
 
     # Calculate disposal_days if possible
     if 'date_filed' in cases.columns and 'decision_date' in cases.columns:
@@ -82,6 +490,9 @@ def clean_cases(cases):
         cases = cases.drop_duplicates(subset='cnr_number')
         cases['cnr_number'] = cases['cnr_number'].astype(str)
 
+    # Derived columns are downcast like the rest of the frame
+    apply_schema(cases, CASE_DATE_COLUMNS)
+
     return cases
 
 # -------------------------------
@@ -92,26 +503,193 @@ def clean_hearings(hearings):
 
     # Convert dates
     if 'businessondate' in hearings.columns:
-        hearings['business_on_date'] = pd.to_datetime(hearings['businessondate'], errors='coerce')
+        hearings['business_on_date'] = parse_dates(hearings['businessondate'])
 
-    # Drop duplicate CNRs
+    apply_schema(hearings, HEARING_DATE_COLUMNS)
+
+    # Keep every hearing, grouped by case and in date order within a case
     if 'cnr_number' in hearings.columns:
-        hearings = hearings.drop_duplicates(subset='cnr_number')
-        hearings.loc[:, 'cnr_number'] = hearings['cnr_number'].astype(str)
+        hearings['cnr_number'] = hearings['cnr_number'].astype(str)
+        hearings = hearings.sort_values(
+            [c for c in ('cnr_number', 'business_on_date') if c in hearings.columns],
+            kind='stable', ignore_index=True,
+        )
 
     return hearings
 
 # -------------------------------
-# Step 5: Memory-safe merge
+# Step 4b: Per-case hearing aggregates
+# -------------------------------
+def hearing_aggregates(hearings):
+    """
+    One row per cnr_number of hearings (which must be grouped by case, in
+    date order, as clean_hearings leaves it) with the HEARING_AGGREGATE_COLUMNS
+    its columns allow. An adjournment is a hearing listed for the same
+    purpose as the case's previous hearing.
+    """
+    codes, uniques = pd.factorize(hearings['cnr_number'])
+    n = len(codes)
+    # Group boundaries are where the case code changes
+    same_case = np.diff(codes) == 0
+    starts = np.flatnonzero(np.r_[True, ~same_case]) if n else np.zeros(0, dtype=np.intp)
+    ends = np.r_[starts[1:], n].astype(np.intp)
+
+    out = {
+        'cnr_number': pd.Series(uniques, dtype=hearings['cnr_number'].dtype),
+        'hearing_count': (ends - starts).astype(np.int32),
+    }
+
+    if 'business_on_date' in hearings.columns and n:
+        dates = hearings['business_on_date']
+        # NaT dates sort last within a case, so the valid ones lead each group
+        n_valid = np.add.reduceat(dates.notna().to_numpy().astype(np.int64), starts)
+        has_date = n_valid > 0
+        first = dates.array.take(np.where(has_date, starts, -1), allow_fill=True)
+        last = dates.array.take(np.where(has_date, starts + n_valid - 1, -1), allow_fill=True)
+        # Dates are sorted, so the mean gap is the span over the gap count
+        span_days = (pd.Series(last) - pd.Series(first)).dt.days.to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_gap = np.where(n_valid > 1, span_days / (n_valid - 1), np.nan)
+        out['first_hearing_date'] = first
+        out['last_hearing_date'] = last
+        out['mean_hearing_gap_days'] = mean_gap.astype(np.float32)
+
+    if 'purposeofhearing' in hearings.columns and n:
+        purpose, _ = pd.factorize(hearings['purposeofhearing'])
+        repeated = same_case & (np.diff(purpose) == 0) & (purpose[1:] >= 0)
+        out['adjournments'] = np.add.reduceat(np.r_[False, repeated].astype(np.int32), starts)
+
+    return pd.DataFrame(out)
+
+
+def add_hearing_aggregates(cases, hearings, columns=None):
+    """
+    cases with the hearing aggregates (those in columns, all if None) of
+    each case's hearings; cases without hearings get a count of 0.
+    """
+    if 'cnr_number' not in cases.columns or 'cnr_number' not in hearings.columns:
+        return cases
+    aggregates = hearing_aggregates(hearings)
+    wanted = [
+        c for c in HEARING_AGGREGATE_COLUMNS
+        if c in aggregates.columns and (columns is None or c in columns)
+    ]
+    if not wanted:
+        return cases
+
+    _, idx = join_indexer(cases['cnr_number'], aggregates['cnr_number'])
+    unmatched = idx < 0
+    cases = cases.drop(columns=[c for c in wanted if c in cases.columns])
+    for col in wanted:
+        values = take_column(aggregates[col], idx, allow_fill=bool(unmatched.any()))
+        if col in ('hearing_count', 'adjournments'):
+            values = np.where(unmatched, 0, values).astype(np.int32)
+        elif col == 'mean_hearing_gap_days':
+            values = values.astype(np.float32)
+        cases[col] = values
+    return cases
+
+# -------------------------------
+# Step 5: Index-based join
 # -------------------------------
-def merge_data(cases, hearings, chunk_size=100000):
-    merged_chunks = []
-    for start in range(0, len(hearings), chunk_size):
-        chunk = hearings.iloc[start:start+chunk_size]
-        merged_chunk = chunk.merge(cases, on='cnr_number', how='left')
-        merged_chunks.append(merged_chunk)
-    merged_data = pd.concat(merged_chunks, ignore_index=True)
-    return merged_data
+# The key column of the right frame is hashed once and the left keys probed
+# against it, giving integer take-indices; every output column is then one
+# gather of its source column into a freshly allocated array.
+def join_indexer(left_keys, right_keys):
+    """
+    Row mapping of left_keys LEFT JOIN right_keys: output row i joins left
+    row left_idx[i] to right row right_idx[i] (-1: no match). Output order
+    follows pd.merge - left order, then right order within a key. left_idx
+    is None when every left row appears exactly once, i.e. is arange(n).
+    """
+    if left_keys.dtype != right_keys.dtype:
+        left_keys, right_keys = left_keys.astype(object), right_keys.astype(object)
+
+    # One factorisation over both key columns. Right keys come first, so
+    # codes below n_keys are keys present on the right and any higher code
+    # is a left key without a match. NaN keys match each other, as in pd.merge
+    codes, _ = pd.factorize(
+        pd.concat([right_keys, left_keys], ignore_index=True), use_na_sentinel=False
+    )
+    right_codes = codes[:len(right_keys)]
+    n_keys = int(right_codes.max()) + 1 if len(right_codes) else 0
+    left_codes = codes[len(right_keys):]
+    left_codes = np.where(left_codes < n_keys, left_codes, -1).astype(np.intp)
+
+    if n_keys == len(right_codes):
+        # Unique right keys: codes are assigned by first appearance, so the
+        # code of a key is the row that holds it
+        return None, left_codes
+
+    # Duplicate right keys: right rows grouped by code, in original order
+    counts = np.bincount(right_codes, minlength=n_keys)
+    order = np.argsort(right_codes, kind="stable")
+    starts = np.cumsum(counts) - counts
+
+    matched = left_codes >= 0
+    per_left = np.where(matched, counts[left_codes], 1)
+    left_idx = np.repeat(np.arange(len(left_codes), dtype=np.intp), per_left)
+    first_out = np.cumsum(per_left) - per_left
+    within = np.arange(len(left_idx)) - np.repeat(first_out, per_left)
+    codes = left_codes[left_idx]
+    right_idx = np.where(
+        codes >= 0, order[starts[np.maximum(codes, 0)] + within], -1
+    ).astype(np.intp)
+    return left_idx, right_idx
+
+
+def take_column(series, indexer, allow_fill):
+    """Gather series at indexer (-1 -> missing, when allow_fill) as a new array."""
+    if isinstance(series.dtype, np.dtype):
+        # Preallocates the output and upcasts only when a fill is needed
+        # (int -> float64, bool -> object), as pd.merge does
+        return pd.api.extensions.take(series.to_numpy(), indexer, allow_fill=allow_fill)
+    return series.array.take(indexer, allow_fill=allow_fill)
+
+
+def as_column(values):
+    """values as a Series of their own dtype (object columns stay object)."""
+    return pd.Series(values, dtype=values.dtype, copy=False)
+
+
+def join_by_indexer(left, right, left_idx, right_idx, left_on, right_on=None,
+                    suffixes=("_x", "_y")):
+    """
+    Build the joined frame for a row mapping from join_indexer (or any
+    other source of take-indices), named as pd.merge would name it.
+    """
+    right_on = right_on or left_on
+    fill = bool((right_idx < 0).any())
+
+    shared_key = left_on == right_on
+    out = {}
+    for col in left.columns:
+        name = col + suffixes[0] if col in right.columns and not (shared_key and col == left_on) else col
+        # Unrepeated left columns are reused as they are
+        values = left[col].array if left_idx is None else take_column(left[col], left_idx, False)
+        out[name] = as_column(values)
+    for col in right.columns:
+        if shared_key and col == right_on:
+            continue
+        name = col + suffixes[1] if col in left.columns else col
+        out[name] = as_column(take_column(right[col], right_idx, fill))
+
+    return pd.DataFrame(out, index=pd.RangeIndex(len(right_idx)), copy=False)
+
+
+def left_join(left, right, left_on, right_on=None, suffixes=("_x", "_y")):
+    """
+    pd.merge(left, right, how="left", left_on=..., right_on=...) through
+    join_indexer, with the same column order, suffixes and dtypes.
+    """
+    right_on = right_on or left_on
+    left_idx, right_idx = join_indexer(left[left_on], right[right_on])
+    return join_by_indexer(left, right, left_idx, right_idx, left_on, right_on, suffixes)
+
+
+def merge_data(cases, hearings):
+    """Hearings LEFT JOIN cases on cnr_number (case columns suffixed _y on clashes)."""
+    return left_join(hearings, cases, "cnr_number")
 
 # -------------------------------
 # Example usage
@@ -120,6 +698,7 @@ if __name__ == "__main__":
     cases, hearings = load_data()
     cases = clean_cases(cases)
     hearings = clean_hearings(hearings)
+    cases = add_hearing_aggregates(cases, hearings)
     merged_data = merge_data(cases, hearings)
 
     print(merged_data.head())
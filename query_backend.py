@@ -0,0 +1,295 @@
+# Optional embedded SQL backend for the per-user dashboard filters.
+#
+# With NYAYADRISHTI_QUERY_BACKEND=sqlite the cleaned cases and hearings of a
+# data version are loaded once, by the background warm-up of the full
+# dataset, into one local SQLite file; page projections query it. The full
+# dataset is the mapped snapshot or the single load page projections are
+# sliced from, so the data is not held twice. It is indexed on cnr_number,
+# the judge columns (through a judge -> bench value table that includes
+# bench entries, as search_index.JudgeIndex does) and the advocate columns
+# (FTS5 trigram, i.e. case-insensitive substring search). The Judge and
+# Lawyer dashboards then fetch only the logged-in user's rows through
+# parameterised queries instead of filtering the whole merged frame.
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from data_store import add_warmup_step, start_warmup
+from search_index import bench_judges, normalize_name
+
+BACKEND_ENV = "NYAYADRISHTI_QUERY_BACKEND"
+QUERY_DIR = Path(__file__).parent / "data" / ".cache" / "query"
+
+JUDGE_COLUMNS = ["beforehonourablejudges", "njdg_judge_name"]
+ADVOCATE_COLUMNS = ["petitioneradvocate", "respondentadvocate"]
+
+# The trigram tokenizer cannot match needles shorter than three characters
+FTS_MIN_NEEDLE = 3
+
+
+def backend_enabled() -> bool:
+    return os.environ.get(BACKEND_ENV, "").lower() == "sqlite"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteBackend:
+    """Read-only SQLite copy of one dataset's cleaned cases and hearings."""
+
+    def __init__(self, path, columns, date_columns, fts_tables):
+        self.path = path
+        self.columns = columns             # {"cases": [...], "hearings": [...]}
+        self.date_columns = date_columns   # datetime64 columns, restored on read
+        self.fts_tables = fts_tables       # {"cases": [...searchable cols], ...}
+        self._local = threading.local()
+
+    def project(self, columns) -> "SqliteBackend":
+        """A view of this backend returning only columns (all if None)."""
+        if columns is None:
+            return self
+        wanted = set(columns)
+        view = SqliteBackend(
+            self.path,
+            {name: [c for c in cols if c in wanted] for name, cols in self.columns.items()},
+            self.date_columns,
+            self.fts_tables,
+        )
+        view._local = self._local      # share the per-thread connections
+        return view
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+    @classmethod
+    def build(cls, dataset):
+        """Load the full dataset into SQLite (once per version) and index it."""
+        frames = {"cases": dataset._cases, "hearings": dataset._hearings}
+        path = QUERY_DIR / f"{dataset.version}.sqlite"
+
+        columns = {name: list(df.columns) for name, df in frames.items()}
+        date_columns = {
+            col for df in frames.values() for col in df.columns
+            if pd.api.types.is_datetime64_any_dtype(df[col])
+        }
+        fts_tables = {
+            name: [c for c in JUDGE_COLUMNS + ADVOCATE_COLUMNS if c in df.columns]
+            for name, df in frames.items()
+        }
+        fts_tables = {name: cols for name, cols in fts_tables.items() if cols}
+
+        if not path.exists():
+            QUERY_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.unlink(missing_ok=True)
+            # The connection's own context manager only commits; closing()
+            # releases the file before it is renamed into place
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                with conn:
+                    for name, df in frames.items():
+                        cls._load_table(conn, name, df, fts_tables.get(name, []))
+                    cls._load_judge_benches(conn, frames)
+            os.replace(tmp_path, path)
+            print(f"[QUERY] built {path.name} for data version {dataset.version}")
+
+            # Open connections keep working after their file is unlinked
+            for old_path in QUERY_DIR.glob("*.sqlite"):
+                if old_path.stem != dataset.version:
+                    old_path.unlink(missing_ok=True)
+
+        return cls(path, columns, date_columns, fts_tables)
+
+    @staticmethod
+    def _load_table(conn, name, df, search_columns):
+        # rowid follows frame order, so ORDER BY rowid reproduces pandas order
+        df.to_sql(name, conn, index=False, chunksize=50_000)
+        if "cnr_number" in df.columns:
+            conn.execute(f"CREATE INDEX {name}_cnr ON {name}(cnr_number)")
+        for col in JUDGE_COLUMNS:
+            if col in df.columns:
+                conn.execute(f"CREATE INDEX {name}_{col} ON {name}({_quote(col)})")
+        if search_columns:
+            cols = ", ".join(_quote(c) for c in search_columns)
+            conn.execute(
+                f"CREATE VIRTUAL TABLE {name}_fts USING fts5({cols}, content={name}, "
+                f"tokenize='trigram case_sensitive 0')"
+            )
+            conn.execute(f"INSERT INTO {name}_fts({name}_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _load_judge_benches(conn, frames):
+        # One row per (normalised judge name, distinct bench value naming them)
+        rows = [
+            (name, col, judge, bench)
+            for name, df in frames.items()
+            for col in JUDGE_COLUMNS if col in df.columns
+            for bench in pd.unique(df[col].dropna().astype(str))
+            for judge in bench_judges(bench)
+        ]
+        conn.execute("CREATE TABLE judge_benches (tbl TEXT, col TEXT, judge TEXT, bench TEXT)")
+        conn.executemany("INSERT INTO judge_benches VALUES (?, ?, ?, ?)", rows)
+        conn.execute("CREATE INDEX judge_benches_judge ON judge_benches(tbl, col, judge)")
+
+    # ----------------------------
+    # Query helpers
+    # ----------------------------
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def _join(self, left, right, left_key, right_key, suffixes):
+        """
+        SELECT list reproducing pd.merge(left, right, left_on, right_on)
+        column naming. Returns (select_sql, {output column: source expr}).
+        """
+        left_cols, right_cols = self.columns[left], self.columns[right]
+        shared_key = left_key == right_key
+        outputs = {}
+        for col in left_cols:
+            clash = col in right_cols and not (shared_key and col == left_key)
+            outputs[col + suffixes[0] if clash else col] = ("l", col)
+        for col in right_cols:
+            if shared_key and col == right_key:
+                continue
+            clash = col in left_cols
+            outputs[col + suffixes[1] if clash else col] = ("r", col)
+
+        select = ", ".join(
+            f"{alias}.{_quote(col)} AS {_quote(out)}" for out, (alias, col) in outputs.items()
+        )
+        return select, outputs
+
+    def _contains(self, alias, table, col, needle, params):
+        """Case-insensitive substring test, through the trigram index when possible."""
+        if table in self.fts_tables and col in self.fts_tables[table] and len(needle) >= FTS_MIN_NEEDLE:
+            params.append(f'{{{_quote(col)}}} : "{needle.replace(chr(34), chr(34) * 2)}"')
+            return f"{alias}.rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)"
+        params.append(needle.lower())
+        return f"instr(LOWER({alias}.{_quote(col)}), ?) > 0"
+
+    def _query(self, left, right, left_key, right_key, suffixes, where_sql, params,
+               where_on_right, extra_select=""):
+        select, outputs = self._join(left, right, left_key, right_key, suffixes)
+        # A predicate on the right side rejects NULL rows, so an inner join
+        # is equivalent and lets SQLite drive the join from that index
+        join = "JOIN" if where_on_right else "LEFT JOIN"
+        sql = (
+            f"SELECT {select}{extra_select} FROM {left} l {join} {right} r "
+            f"ON l.{_quote(left_key)} = r.{_quote(right_key)} "
+            f"WHERE {where_sql} ORDER BY l.rowid, r.rowid"
+        )
+        parse_dates = {
+            out: {"format": "ISO8601"}
+            for out, (alias, col) in outputs.items() if col in self.date_columns
+        }
+        return pd.read_sql_query(sql, self._conn(), params=params, parse_dates=parse_dates)
+
+    # ----------------------------
+    # Dashboard queries
+    # ----------------------------
+    def judge_cases(self, judge_name, left_key, right_key):
+        """
+        Judge dashboard rows: cases LEFT JOIN hearings (suffixes _case/_hear)
+        whose bench is, or includes, judge_name - as JudgeIndex.lookup -
+        with a 'judge' column as built by the page.
+        """
+        _, outputs = self._join("cases", "hearings", left_key, right_key, ("_case", "_hear"))
+        judge_out = next((c for c in JUDGE_COLUMNS if c in outputs), None)
+        if judge_out is None:
+            return None
+        alias, col = outputs[judge_out]
+        table = "cases" if alias == "l" else "hearings"
+        return self._query(
+            "cases", "hearings", left_key, right_key, ("_case", "_hear"),
+            f"{alias}.{_quote(col)} IN (SELECT bench FROM judge_benches "
+            f"WHERE tbl = ? AND col = ? AND judge = ?)",
+            [table, col, normalize_name(judge_name)],
+            where_on_right=(alias == "r"),
+            extra_select=f", {alias}.{_quote(col)} AS judge",
+        )
+
+    def _advocate_where(self, name):
+        """WHERE clause on cases (alias l): an advocate column contains name."""
+        clauses, params = [], []
+        for col in ADVOCATE_COLUMNS:
+            if col in self.columns["cases"]:
+                clauses.append(self._contains("l", "cases", col, name, params))
+        if not clauses:
+            return None
+        return "(" + " OR ".join(clauses) + ")", params
+
+    def advocate_portfolio(self, advocate_name):
+        """
+        Every case whose petitioner or respondent advocate contains
+        advocate_name, LEFT JOIN its hearings - as CaseHearings.join over
+        the advocate index, so cases without hearings are listed too.
+        """
+        where = self._advocate_where(advocate_name)
+        if where is None:
+            return None
+        where_sql, params = where
+        return self._query(
+            "cases", "hearings", "cnr_number", "cnr_number", ("_x", "_y"),
+            where_sql, params, where_on_right=False,
+        )
+
+    def has_judge_cases(self, name):
+        """Login check: any hearing naming a judge that contains name, as JudgeIndex.search."""
+        row = self._conn().execute(
+            "SELECT 1 FROM judge_benches WHERE tbl = 'hearings' "
+            "AND col = 'beforehonourablejudges' AND instr(judge, ?) > 0 LIMIT 1",
+            [normalize_name(name)],
+        ).fetchone()
+        return row is not None
+
+    def has_advocate_cases(self, name):
+        """Login check: any case with an advocate containing name."""
+        where = self._advocate_where(name)
+        if where is None:
+            return False
+        where_sql, params = where
+        row = self._conn().execute(f"SELECT 1 FROM cases l WHERE {where_sql} LIMIT 1", params).fetchone()
+        return row is not None
+
+
+_backends = {}                       # data version -> backend over the full dataset
+_backends_lock = threading.Lock()
+
+
+def _build_backend(dataset):
+    backend = SqliteBackend.build(dataset)
+    with _backends_lock:
+        _backends.clear()
+        _backends[dataset.version] = backend
+
+
+# Built off the request path, from the full dataset, once per version. With
+# a full-dataset step registered, the data store slices page projections from
+# that same dataset instead of loading them separately
+if backend_enabled():
+    add_warmup_step(_build_backend)
+
+
+def get_backend(dataset):
+    """
+    The SQLite backend restricted to dataset's columns, or None when the
+    backend is disabled or its file is still being built by the warm-up
+    (pages then use the in-memory indexes, which return the same rows).
+    """
+    if not backend_enabled():
+        return None
+    with _backends_lock:
+        backend = _backends.get(dataset.version)
+    if backend is None:
+        start_warmup()
+        return None
+    return backend.project(dataset.columns)
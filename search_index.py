@@ -0,0 +1,184 @@
+# Inverted indexes for the per-user dashboard lookups.
+#
+# Judge and advocate names live in low-cardinality columns, so the indexes
+# work on the dictionary of distinct values: each distinct value is parsed
+# once, and a posting list (sorted row positions) per value maps matches
+# back to rows. A lookup then costs in proportion to its matches instead of
+# a string scan over every row.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# A bench lists several judges: "HON A KUMAR, HON B RAO", "HON D MENON & HON C DESAI"
+BENCH_SEPARATORS = re.compile(r"\s*(?:,|&|;|\bAND\b)\s*")
+
+
+def normalize_name(name):
+    """Upper-case and collapse whitespace, as names are compared."""
+    return " ".join(str(name).upper().split())
+
+
+def bench_judges(value):
+    """Normalised names a bench value is found under: the bench and each judge on it."""
+    bench = normalize_name(value)
+    return {bench} | {j for j in BENCH_SEPARATORS.split(bench) if j}
+
+
+class Postings:
+    """Sorted row positions of every distinct value of a column."""
+
+    def __init__(self, values, order, offsets):
+        self.values = values        # distinct values, position = value code
+        self._order = order         # row positions grouped by value code
+        self._offsets = offsets
+
+    @classmethod
+    def build(cls, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, values = pd.factorize(series)
+        # A stable sort keeps each value's positions in row order
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        missing = len(codes) - counts.sum()
+        offsets = missing + np.r_[0, np.cumsum(counts)]
+        return cls(list(values), order.astype(np.intp), offsets.astype(np.intp))
+
+    def rows(self, codes) -> np.ndarray:
+        """Sorted row positions holding any of the value codes."""
+        parts = [self._order[self._offsets[c]:self._offsets[c + 1]] for c in codes]
+        if not parts:
+            return np.zeros(0, dtype=np.intp)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+
+class JudgeIndex:
+    """Normalised judge name -> sorted row positions, bench entries included."""
+
+    def __init__(self, postings, names):
+        self._postings = postings
+        self._names = names         # judge name -> value codes naming them
+
+    @classmethod
+    def build(cls, series):
+        postings = Postings.build(series)
+        names = {}
+        for code, value in enumerate(postings.values):
+            for judge in bench_judges(value):
+                names.setdefault(judge, []).append(code)
+        return cls(postings, names)
+
+    @property
+    def names(self):
+        return sorted(self._names)
+
+    def lookup(self, judge_name) -> np.ndarray:
+        """Rows whose bench is, or includes, judge_name."""
+        return self._postings.rows(self._names.get(normalize_name(judge_name), []))
+
+    def search(self, text) -> np.ndarray:
+        """Rows whose bench names a judge containing text (case-insensitive)."""
+        needle = normalize_name(text)
+        codes = {c for name, name_codes in self._names.items() if needle in name for c in name_codes}
+        return self._postings.rows(sorted(codes))
+
+
+def judge_index(dataset, column, frame=None, frame_name="hearings"):
+    """
+    JudgeIndex over column of frame(dataset) - the dataset's hearings unless
+    given - built once per data version.
+    """
+    frame = frame or (lambda ds: ds.hearings)
+    return dataset.derived(
+        f"judge_index:{frame_name}:{column}",
+        lambda ds: JudgeIndex.build(frame(ds)[column]),
+    )
+
+
+# ----------------------------
+# Advocates
+# ----------------------------
+ADVOCATE_COLUMNS = ["petitioneradvocate", "respondentadvocate"]
+GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class AdvocateIndex:
+    """
+    Case-insensitive substring search over advocate columns, as
+    str.contains(name, case=False) without the regex. A trigram index over
+    the distinct advocate strings narrows the candidates, which are then
+    verified and mapped back to rows through each column's postings.
+    """
+
+    def __init__(self, vocab, grams, postings, codes):
+        self._vocab = vocab         # distinct lower-cased strings
+        self._grams = grams         # trigram -> sorted vocab ids
+        self._postings = postings   # Postings of each indexed column
+        self._codes = codes         # vocab id -> [(column number, value code)]
+
+    @classmethod
+    def build(cls, frame, columns=ADVOCATE_COLUMNS):
+        vocab_ids, vocab, postings, codes = {}, [], [], {}
+        for col in columns:
+            if col not in frame.columns:
+                continue
+            col_postings = Postings.build(frame[col])
+            for code, value in enumerate(col_postings.values):
+                key = str(value).lower()
+                if key not in vocab_ids:
+                    vocab_ids[key] = len(vocab)
+                    vocab.append(key)
+                codes.setdefault(vocab_ids[key], []).append((len(postings), code))
+            postings.append(col_postings)
+
+        grams = {}
+        for vocab_id, text in enumerate(vocab):
+            for gram in _grams(text):
+                grams.setdefault(gram, []).append(vocab_id)
+        grams = {gram: np.asarray(ids, dtype=np.intp) for gram, ids in grams.items()}
+        return cls(vocab, grams, postings, codes)
+
+    def _matching_vocab(self, needle):
+        needle = needle.lower()
+        if len(needle) < GRAM:
+            # Too short for a trigram; the vocabulary is small enough to scan
+            return {i for i, text in enumerate(self._vocab) if needle in text}
+        lists = []
+        for gram in _grams(needle):
+            if gram not in self._grams:
+                return set()
+            lists.append(self._grams[gram])
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        # Shared trigrams do not imply a substring; verify each candidate
+        return {i for i in candidates.tolist() if needle in self._vocab[i]}
+
+    def search(self, name) -> np.ndarray:
+        """Sorted positions of rows where any advocate column contains name."""
+        codes = [[] for _ in self._postings]
+        for vocab_id in self._matching_vocab(str(name)):
+            for column, code in self._codes[vocab_id]:
+                codes[column].append(code)
+        parts = [postings.rows(c) for postings, c in zip(self._postings, codes) if c]
+        if not parts:
+            return np.zeros(0, dtype=np.intp)
+        return np.unique(np.concatenate(parts))
+
+
+def advocate_index(dataset, columns=ADVOCATE_COLUMNS):
+    """AdvocateIndex over the dataset's cases, built once per data version."""
+    return dataset.derived(
+        f"advocate_index:{':'.join(columns)}",
+        lambda ds: AdvocateIndex.build(ds.cases, columns),
+    )
@@ -0,0 +1,22 @@
+# Starts the dashboard with its data already warming.
+#
+#   python serve.py [streamlit options]
+#
+# Same as `streamlit run app.py`, except that every page's projection and
+# artifacts start building in the background before the server accepts its
+# first visitor. Streamlit runs pages in this process, so the pages then
+# find the warm-up already under way (or done) instead of starting it.
+
+import os
+import sys
+
+from streamlit.web import cli
+
+import page_data  # starts every page's warm-up
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+if __name__ == "__main__":
+    sys.argv = ["streamlit", "run", APP, *sys.argv[1:]]
+    sys.exit(cli.main())
@@ -0,0 +1,164 @@
+# Memory-mapped Arrow snapshot of the cleaned dataset.
+#
+# With NYAYADRISHTI_SHARED_SNAPSHOT=1 the first Streamlit process to build a
+# data version writes cases and hearings as Arrow IPC files; every
+# process then memory-maps them, so N server processes share one copy of the
+# court data through the page cache instead of holding N pandas copies.
+
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+try:
+    import fcntl
+except ImportError:   # Windows: no cross-process lock, last writer wins
+    fcntl = None
+
+SNAPSHOT_ENV = "NYAYADRISHTI_SHARED_SNAPSHOT"
+SNAPSHOT_DIR = Path(__file__).parent / "data" / ".cache" / "snapshot"
+FRAMES = ["cases", "hearings"]
+METADATA_KEY = b"nyayadrishti"
+
+
+def snapshot_enabled() -> bool:
+    """True when the shared snapshot mode is switched on and pyarrow is available."""
+    enabled = os.environ.get(SNAPSHOT_ENV, "").lower() in ("1", "true", "yes", "mmap")
+    return enabled and pa is not None
+
+
+def _version_dir(version) -> Path:
+    return SNAPSHOT_DIR / version
+
+
+@contextmanager
+def build_lock(version):
+    """Serialise snapshot builds across processes for one version."""
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    lock_path = SNAPSHOT_DIR / f"{version}.lock"
+    with open(lock_path, "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _string_types_mapper(arrow_type):
+    # pandas 3 already keeps strings Arrow-backed; on pandas 2 ask for it, so
+    # text columns stay in the mapped buffers instead of becoming Python objects
+    if int(pd.__version__.split(".")[0]) < 3 and (
+        pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+    ):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _write_frame(df, path, metadata=None):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata is not None:
+        # Keep the pandas metadata (categoricals, ...) alongside ours
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[METADATA_KEY] = json.dumps(metadata).encode()
+        table = table.replace_schema_metadata(schema_metadata)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _read_table(path):
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    # split_blocks avoids consolidating columns into new 2-D blocks, so
+    # null-free numeric and datetime columns stay zero-copy views of the map
+    df = table.to_pandas(split_blocks=True, types_mapper=_string_types_mapper)
+    metadata = (table.schema.metadata or {}).get(METADATA_KEY)
+    return df, json.loads(metadata) if metadata else None
+
+
+def _read_frame(path):
+    return _read_table(path)[0]
+
+
+def load_snapshot(version):
+    """Return {name: frame} memory-mapped from the snapshot, or None if absent."""
+    version_dir = _version_dir(version)
+    paths = {name: version_dir / f"{name}.arrow" for name in FRAMES}
+    if not all(path.exists() for path in paths.values()):
+        return None
+    try:
+        return {name: _read_frame(path) for name, path in paths.items()}
+    except Exception as e:
+        print(f"[SNAPSHOT] could not map snapshot {version}: {e}")
+        return None
+
+
+def write_snapshot(version, frames):
+    """Write {name: frame} for version and drop snapshots of older versions."""
+    version_dir = _version_dir(version)
+    version_dir.mkdir(parents=True, exist_ok=True)
+    for name in FRAMES:
+        _write_frame(frames[name], version_dir / f"{name}.arrow")
+
+    # Processes still mapping an old version keep their pages until they
+    # move on; unlinking does not invalidate an existing mapping
+    for old_dir in SNAPSHOT_DIR.iterdir():
+        if old_dir.is_dir() and old_dir.name != version:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        elif old_dir.suffix == ".lock" and old_dir.stem != version:
+            old_dir.unlink(missing_ok=True)
+    print(f"[SNAPSHOT] wrote snapshot {version} to {version_dir}")
+
+
+def load_artifact(version, name):
+    """(frame, metadata) of a derived artifact mapped from the snapshot, or None."""
+    path = _version_dir(version) / f"{name}.arrow"
+    if not path.exists():
+        return None
+    try:
+        return _read_table(path)
+    except Exception as e:
+        print(f"[SNAPSHOT] could not map {name} for {version}: {e}")
+        return None
+
+
+def write_artifact(version, name, df, metadata=None):
+    """Store a derived frame (plus JSON metadata) next to the version's snapshot."""
+    version_dir = _version_dir(version)
+    version_dir.mkdir(parents=True, exist_ok=True)
+    _write_frame(df, version_dir / f"{name}.arrow", metadata)
+
+
+def load_summary(version):
+    """The version's landing-page summary written with the snapshot, or None."""
+    path = _version_dir(version) / "summary.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        print(f"[SNAPSHOT] could not read summary for {version}: {e}")
+        return None
+
+
+def write_summary(version, summary):
+    """Store the landing-page summary (a JSON-able dict) next to the version's snapshot."""
+    version_dir = _version_dir(version)
+    version_dir.mkdir(parents=True, exist_ok=True)
+    path = version_dir / "summary.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(summary))
+    os.replace(tmp_path, path)
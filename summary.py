@@ -0,0 +1,99 @@
+# Materialised summary behind the landing-page quick stats.
+#
+# A few numbers - totals, the case-type split and the filing days of
+# pending cases - computed once per data version from the cleaned cases.
+# Pending ages are bucketed against the current day when the page reads
+# them, so they stay right on a long-running server. In shared-snapshot
+# mode the summary is written as JSON next to the snapshot, so the public
+# landing page reads a small file instead of loading or mapping the data.
+
+import numpy as np
+import pandas as pd
+
+# Case columns the summary is computed from
+SUMMARY_COLUMNS = ["cnr_number", "case_type", "current_status", "date_filed", "decision_date"]
+# Case types filed on the criminal side, by prefix (CRL.P, CRL.A, ...)
+CRIMINAL_PREFIXES = ("CRL",)
+PENDING_STATUS = "pending"
+# (label, lower bound in days) of each pending-age bucket, ascending
+PENDING_AGE_BUCKETS = [
+    ("< 1 year", 0),
+    ("1-3 years", 365),
+    ("3-5 years", 3 * 365),
+    ("> 5 years", 5 * 365),
+]
+
+
+def is_criminal(case_type) -> bool:
+    return str(case_type).upper().startswith(CRIMINAL_PREFIXES)
+
+
+def _today(today=None):
+    return np.datetime64(pd.Timestamp.now().date() if today is None else pd.Timestamp(today).date(), "D")
+
+
+def build_summary(cases) -> dict:
+    """
+    Totals, case-type split and the filing days of pending cases, so ages
+    are bucketed against the day the summary is read. Cases already in the
+    oldest bucket stay there and are only counted ("oldest"); the other
+    distinct filing days are stored sorted, as the first day and the steps
+    in days between them, with the pending count of each.
+    """
+    if "case_type" in cases.columns:
+        case_types = cases["case_type"].value_counts(dropna=False)
+        case_types = {str(k): int(v) for k, v in case_types.items() if v > 0}
+    else:
+        case_types = {}
+    criminal = sum(n for case_type, n in case_types.items() if is_criminal(case_type))
+
+    if "current_status" in cases.columns:
+        status = cases["current_status"].astype("string").str.strip().str.lower()
+        pending = (status == PENDING_STATUS).fillna(False).to_numpy(dtype=bool)
+    else:
+        # Without a status, a case with no decision yet is pending
+        pending = cases["decision_date"].isna().to_numpy()
+
+    filed_days = {"oldest": 0, "first": None, "steps": [], "counts": []}
+    if "date_filed" in cases.columns:
+        filed = cases["date_filed"].to_numpy()[pending]
+        filed = filed[~np.isnat(filed)].astype("datetime64[D]")
+        oldest = filed <= _today() - PENDING_AGE_BUCKETS[-1][1]
+        days, counts = np.unique(filed[~oldest], return_counts=True)
+        filed_days["oldest"] = int(oldest.sum())
+        if len(days):
+            filed_days.update(
+                first=str(days[0]),
+                steps=np.diff(days, prepend=days[0]).astype(np.int64).tolist(),
+                counts=counts.tolist(),
+            )
+
+    return {
+        "total_cases": len(cases),
+        "civil_cases": len(cases) - criminal,
+        "criminal_cases": criminal,
+        "case_types": case_types,
+        "pending_cases": int(pending.sum()),
+        "pending_filed_days": filed_days,
+    }
+
+
+def pending_age(summary, today=None) -> dict:
+    """Pending cases per PENDING_AGE_BUCKETS label, aged from filing to today."""
+    filed = summary["pending_filed_days"]
+    edges = [lower for _, lower in PENDING_AGE_BUCKETS]
+    counts = np.zeros(len(edges))
+    if filed["first"] is not None:
+        days = np.datetime64(filed["first"], "D") + np.cumsum(np.asarray(filed["steps"], dtype=np.int64))
+        age = (_today(today) - days).astype(np.int64)
+        # Cases filed after today (bad dates) count in the first bucket
+        bucket = np.maximum(np.searchsorted(edges, age, side="right") - 1, 0)
+        counts = np.bincount(bucket, weights=filed["counts"], minlength=len(edges))
+    counts[-1] += filed["oldest"]
+    return {label: int(n) for (label, _), n in zip(PENDING_AGE_BUCKETS, counts)}
+
+
+def pending_over_1_year(summary, today=None) -> int:
+    """Pending cases filed a year or more before today."""
+    buckets = pending_age(summary, today)
+    return sum(buckets.values()) - buckets[PENDING_AGE_BUCKETS[0][0]]
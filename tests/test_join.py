@@ -0,0 +1,121 @@
+# left_join / join_indexer against pd.merge(how="left"), which they replace.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import join_indexer, left_join, merge_data
+
+
+def _merge(left, right, left_on, right_on=None, suffixes=("_x", "_y")):
+    if right_on is None or right_on == left_on:
+        return pd.merge(left, right, how="left", on=left_on, suffixes=suffixes)
+    return pd.merge(left, right, how="left", left_on=left_on, right_on=right_on, suffixes=suffixes)
+
+
+def assert_matches_merge(left, right, left_on, right_on=None, suffixes=("_x", "_y")):
+    pd.testing.assert_frame_equal(
+        left_join(left, right, left_on, right_on, suffixes),
+        _merge(left, right, left_on, right_on, suffixes),
+    )
+
+
+def test_unmatched_left_keys():
+    left = pd.DataFrame({"key": ["a", "b", "c", "d"], "x": [1, 2, 3, 4]})
+    right = pd.DataFrame({"key": ["b", "d"], "y": [20, 40]})
+    assert_matches_merge(left, right, "key")
+
+
+def test_unmatched_rows_upcast_like_merge():
+    left = pd.DataFrame({"key": [1, 2, 3]})
+    right = pd.DataFrame({"key": [2], "count": np.array([5], dtype=np.int32), "flag": [True]})
+    assert_matches_merge(left, right, "key")
+
+
+@pytest.mark.parametrize("missing", [None, np.nan])
+def test_missing_keys_match_each_other(missing):
+    left = pd.DataFrame({"key": ["a", missing, "b", missing], "x": range(4)}, dtype=object)
+    right = pd.DataFrame({"key": [missing, "a"], "y": [10, 20]})
+    right["key"] = right["key"].astype(object)
+    assert_matches_merge(left, right, "key")
+
+
+def test_float_nan_keys():
+    left = pd.DataFrame({"key": [1.0, np.nan, 2.0], "x": [1, 2, 3]})
+    right = pd.DataFrame({"key": [np.nan, 2.0], "y": ["n", "two"]})
+    assert_matches_merge(left, right, "key")
+
+
+def test_duplicate_right_keys_repeat_left_rows():
+    left = pd.DataFrame({"key": ["a", "b", "c"], "x": [1, 2, 3]})
+    right = pd.DataFrame({"key": ["b", "a", "b", "b"], "y": [1, 2, 3, 4]})
+    assert_matches_merge(left, right, "key")
+
+
+def test_duplicate_keys_on_both_sides():
+    left = pd.DataFrame({"key": ["a", "a", "b", "c", "a"], "x": range(5)})
+    right = pd.DataFrame({"key": ["a", "c", "a"], "y": range(3)})
+    assert_matches_merge(left, right, "key")
+
+
+def test_different_key_names():
+    left = pd.DataFrame({"case_no": ["a", "b", "z"], "x": [1, 2, 3]})
+    right = pd.DataFrame({"combined": ["b", "a", "b"], "y": [1, 2, 3]})
+    assert_matches_merge(left, right, "case_no", "combined")
+
+
+def test_different_key_names_present_on_both_sides():
+    left = pd.DataFrame({"k1": ["a", "b"], "k2": ["p", "q"]})
+    right = pd.DataFrame({"k2": ["b", "a"], "k1": ["r", "s"]})
+    assert_matches_merge(left, right, "k1", "k2")
+
+
+def test_clashing_columns_get_suffixes():
+    left = pd.DataFrame({"key": ["a", "b"], "status": ["open", "closed"], "x": [1, 2]})
+    right = pd.DataFrame({"key": ["a"], "status": ["listed"], "x": [9]})
+    assert_matches_merge(left, right, "key")
+    assert_matches_merge(left, right, "key", suffixes=("_case", "_hear"))
+
+
+def test_extension_dtypes():
+    left = pd.DataFrame({
+        "key": pd.array(["a", "b", "c"], dtype="string"),
+        "stage": pd.Categorical(["x", "y", "x"]),
+    })
+    right = pd.DataFrame({
+        "key": pd.array(["c", "a"], dtype="string"),
+        "judge": pd.Categorical(["J1", "J2"]),
+        "date": pd.to_datetime(["2020-01-02", "2021-03-04"]),
+        "hearings": pd.array([3, 4], dtype="Int64"),
+    })
+    assert_matches_merge(left, right, "key")
+
+
+def test_empty_sides():
+    left = pd.DataFrame({"key": ["a", "b"], "x": [1, 2]})
+    right = pd.DataFrame({"key": pd.Series([], dtype=left["key"].dtype), "y": pd.Series([], dtype="int64")})
+    assert_matches_merge(left, right, "key")
+    assert_matches_merge(left.iloc[:0], right, "key")
+    assert_matches_merge(left.iloc[:0], left.rename(columns={"x": "y"}), "key")
+
+
+def test_unique_right_keys_keep_left_rows_in_place():
+    left_idx, right_idx = join_indexer(pd.Series(["a", "b", "z", "a"]), pd.Series(["b", "a"]))
+    assert left_idx is None
+    np.testing.assert_array_equal(right_idx, [1, 0, -1, 1])
+
+
+def test_merge_data_is_hearings_left_join_cases():
+    cases = pd.DataFrame({
+        "cnr_number": ["C1", "C2", "C3"],
+        "current_status": ["Pending", "Disposed", "Pending"],
+        "purposeofhearing": ["x", "y", "z"],
+    })
+    hearings = pd.DataFrame({
+        "cnr_number": ["C2", "C2", "C9", "C1"],
+        "purposeofhearing": ["Evidence", "Arguments", "Orders", "Appearance"],
+    })
+    pd.testing.assert_frame_equal(
+        merge_data(cases, hearings),
+        pd.merge(hearings, cases, on="cnr_number", how="left"),
+    )
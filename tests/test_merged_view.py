@@ -0,0 +1,92 @@
+# LazyMerged against the materialised merge_data it stands in for.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from case_index import CaseHearings
+from merged_view import LazyMerged
+from preprocessing import merge_data
+
+
+@pytest.fixture
+def frames():
+    cases = pd.DataFrame({
+        "cnr_number": ["C1", "C2", "C3", "C4"],
+        "current_status": pd.Categorical(["Pending", "Disposed", "Pending", "Disposed"]),
+        "filing_year": [2019, 2020, 2019, 2021],
+        "purposeofhearing": ["p1", "p2", "p3", "p4"],
+    })
+    # Grouped by case in date order, as clean_hearings leaves them; C4 has
+    # no hearings and C9 no case
+    hearings = pd.DataFrame({
+        "cnr_number": ["C1", "C1", "C2", "C3", "C3", "C3", "C9"],
+        "purposeofhearing": ["Evidence", "Orders", "Appearance", "Evidence", "Arguments", "Orders", "Hearing"],
+        "remappedstages": ["TRIAL", "JUDGMENT", "APPEARANCE", "TRIAL", "TRIAL", "JUDGMENT", "TRIAL"],
+    })
+    return cases, hearings
+
+
+def view_and_merge(cases, hearings):
+    view = LazyMerged(CaseHearings.build(cases, hearings))
+    return view, merge_data(cases, hearings)
+
+
+def test_full_view_matches_merge(frames):
+    view, merged = view_and_merge(*frames)
+    assert view.columns == list(merged.columns)
+    assert len(view) == len(merged)
+    pd.testing.assert_frame_equal(view.to_frame(), merged)
+
+
+def test_column_selection(frames):
+    view, merged = view_and_merge(*frames)
+    pd.testing.assert_series_equal(view["filing_year"], merged["filing_year"])
+    columns = ["remappedstages", "current_status", "purposeofhearing_y"]
+    pd.testing.assert_frame_equal(view[columns], merged[columns])
+
+
+# A subset is materialised on its own: a case column is only widened for a
+# missing case when the rows in view include one, so dtypes are not compared
+def test_filters(frames):
+    cases, hearings = frames
+    view, merged = view_and_merge(cases, hearings)
+
+    on_trial = view.filter(view["remappedstages"] == "TRIAL")
+    expected = merged[merged["remappedstages"] == "TRIAL"].reset_index(drop=True)
+    pd.testing.assert_frame_equal(on_trial.to_frame(), expected, check_dtype=False)
+
+    filed_2019 = on_trial.filter_cases(cases["filing_year"] == 2019)
+    expected = expected[expected["filing_year"] == 2019].reset_index(drop=True)
+    pd.testing.assert_frame_equal(filed_2019.to_frame(), expected, check_dtype=False)
+
+
+def test_take_and_latest(frames):
+    view, merged = view_and_merge(*frames)
+    rows = np.array([5, 0, 3, 1])
+    pd.testing.assert_frame_equal(
+        view.take(rows).to_frame(), merged.iloc[np.sort(rows)].reset_index(drop=True),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        view.latest().to_frame(),
+        merged.drop_duplicates("cnr_number", keep="last").reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("name", ["remappedstages", "current_status", "filing_year"])
+@pytest.mark.parametrize("dropna", [True, False])
+def test_value_counts(frames, name, dropna):
+    view, merged = view_and_merge(*frames)
+    pd.testing.assert_series_equal(
+        view.value_counts(name, dropna=dropna),
+        merged[name].value_counts(dropna=dropna),
+        check_index_type=False,
+    )
+
+
+def test_duplicate_case_keys_are_rejected(frames):
+    cases, hearings = frames
+    with pytest.raises(ValueError):
+        LazyMerged(CaseHearings.build(pd.concat([cases, cases.iloc[:1]]), hearings))